@@ -11,7 +11,7 @@ from datetime import datetime
 
 from app.services.mapping_generator import MappingGenerator
 from app.services.mapping_validator import MappingValidator
-from app.services.llm_service import LLMService
+from app.services.llm_service import get_llm_service
 from app.models.schemas import CANONICAL_SCHEMA, CLIENT_SCHEMAS
 from app.core.logging import get_logger
 
@@ -88,9 +88,8 @@ async def generate_mapping(request: GenerateMappingRequest):
                 detail=f"Database file not found: {database_path}"
             )
 
-        # Initialize generator
-        llm_service = LLMService()
-        generator = MappingGenerator(llm_service=llm_service)
+        # Initialize generator (shares the pooled LLM client)
+        generator = MappingGenerator(llm_service=get_llm_service())
 
         # Generate mapping
         logger.info(f"Generating mapping for {request.client_id}...")
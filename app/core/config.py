@@ -26,6 +26,7 @@ class Settings(BaseSettings):
     AZURE_SQL_SERVER: str = ""
     AZURE_SQL_USERNAME: str = ""
     AZURE_SQL_PASSWORD: str = ""
+    SQLITE_MMAP_SIZE: int = 268435456  # Bytes of memory-mapped I/O per SQLite connection (0 disables)
 
     # Application Settings
     MAX_QUERY_RESULTS: int = 1000
@@ -36,6 +37,18 @@ class Settings(BaseSettings):
     LLM_TEMPERATURE: float = 0.3
     LLM_MAX_TOKENS: int = 1000
     LLM_REQUEST_TIMEOUT: int = 30
+    LLM_CACHE_MAX_ENTRIES: int = 1024  # Bound on cached LLM mappings (LRU eviction)
+    LLM_CACHE_STATS_LOG_INTERVAL: int = 100  # Log cache hit rate every N mapping requests (0 = never)
+    LLM_MAX_CONNECTIONS: int = 100  # Shared HTTP pool size for LLM calls
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    LLM_BATCH_MAX_QUESTIONS: int = 8  # Questions per batched LLM prompt (1 disables batching)
+    LLM_BATCH_WINDOW_MS: int = 20  # How long a miss waits for others to join its batch
+    LLM_BATCH_MAX_TOKENS: int = 8000  # Completion-token ceiling for one batched call (deployment limit)
+    LLM_BATCH_MAX_TIMEOUT_SECONDS: float = 120.0  # Ceiling on a batched call's per-attempt timeout
+    LLM_ATTEMPT_TIMEOUT_SECONDS: float = 15.0  # Per-attempt cap, set just above typical latency
+    LLM_TIMEOUT_RETRIES: int = 2  # Extra attempts after a timed-out call
+    LLM_TIMEOUT_BACKOFF_SECONDS: float = 0.5  # Base for exponential backoff with full jitter
 
     # Retry Configuration
     MAX_RETRY_ATTEMPTS: int = 3
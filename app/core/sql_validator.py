@@ -3,11 +3,20 @@ SQL Query Validator
 Validates LLM-generated SQL for security and correctness
 """
 import re
+from functools import lru_cache
 from typing import Tuple
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Compiled once at import instead of looked up in re's cache on every call
+_MULTI_STATEMENT_RE = re.compile(
+    r';\s*(select|insert|update|delete|drop|create|alter|exec)', re.IGNORECASE
+)
+_WORD_RE = re.compile(r'\b[a-z_]+\b')
+_LINE_COMMENT_RE = re.compile(r'--[^\n]*')
+_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+
 
 class SQLValidator:
     """Validates SQL queries for security and correctness"""
@@ -42,12 +51,19 @@ class SQLValidator:
         r'varchar\(',
         r'nvarchar\(',
     ]
+    _FORBIDDEN_PATTERN_RES = [
+        (pattern, re.compile(pattern, re.IGNORECASE)) for pattern in FORBIDDEN_PATTERNS
+    ]
 
     @classmethod
+    @lru_cache(maxsize=256)
     def validate(cls, sql: str) -> Tuple[bool, str]:
         """
         Validate SQL query for security
 
+        Results are memoized: the same SQL (e.g. from a cached mapping) is
+        only checked once.
+
         Args:
             sql: SQL query to validate
 
@@ -70,8 +86,8 @@ class SQLValidator:
                 return False, f"Forbidden keyword detected: '{keyword}'"
 
         # Check 3: No dangerous patterns
-        for pattern in cls.FORBIDDEN_PATTERNS:
-            if re.search(pattern, sql, re.IGNORECASE):
+        for pattern, pattern_re in cls._FORBIDDEN_PATTERN_RES:
+            if pattern_re.search(sql):
                 logger.warning(f"Dangerous pattern detected: {pattern}")
                 return False, f"Dangerous pattern detected"
         
@@ -87,13 +103,13 @@ class SQLValidator:
         # Check if there's a semicolon followed by SQL keywords (indicating multiple statements)
         if ';' in sql_for_check:
             # Look for semicolon followed by whitespace and then SQL keywords like SELECT, INSERT, etc.
-            if re.search(r';\s*(select|insert|update|delete|drop|create|alter|exec)', sql_for_check, re.IGNORECASE):
+            if _MULTI_STATEMENT_RE.search(sql_for_check):
                 logger.warning("Multiple SQL statements detected")
                 return False, "Multiple SQL statements are not allowed"
 
         # Check 4: Verify all keywords are allowed
         # Extract all words that look like SQL keywords
-        words = re.findall(r'\b[a-z_]+\b', sql_lower)
+        words = _WORD_RE.findall(sql_lower)
         sql_keywords = {w for w in words if w.upper() == w.upper()}
 
         # Filter to likely SQL keywords (all caps or common SQL words)
@@ -126,8 +142,8 @@ class SQLValidator:
             Sanitized SQL query
         """
         # Remove comments
-        sql = re.sub(r'--[^\n]*', '', sql)
-        sql = re.sub(r'/\*.*?\*/', '', sql, flags=re.DOTALL)
+        sql = _LINE_COMMENT_RE.sub('', sql)
+        sql = _BLOCK_COMMENT_RE.sub('', sql)
 
         # Normalize whitespace
         sql = ' '.join(sql.split())
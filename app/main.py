@@ -17,6 +17,8 @@ import os
 from app.core.config import get_settings
 from app.core.logging import setup_logging, get_logger
 from app.api.routes import queries, mappings
+from app.services.llm_service import get_llm_service
+from app.services.schema_mapper import init_schema_mapper, reset_schema_mapper
 
 # Initialize settings and logging
 settings = get_settings()
@@ -66,7 +68,7 @@ async def health_check():
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    """Log application startup"""
+    """Log application startup and preload the schema mapper"""
     logger.info("=" * 60)
     logger.info("Multi-Tenant Schema Translator API Starting")
     logger.info(f"Environment: {settings.ENV}")
@@ -74,13 +76,25 @@ async def startup_event():
     logger.info(f"OpenAI Endpoint: {settings.AZURE_OPENAI_ENDPOINT}")
     logger.info("=" * 60)
 
+    # Build the mapper and its per-client caches before the first request
+    init_schema_mapper()
+
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log application shutdown"""
+    """Log application shutdown and release pooled connections"""
     logger.info("Multi-Tenant Schema Translator API Shutting Down")
 
+    # Only close the LLM client if one was created during this run
+    if get_llm_service.cache_info().currsize:
+        await get_llm_service().close()
+
+    # Forget the closed client (and the mapper holding it) so an in-process
+    # restart builds fresh ones instead of reusing a closed connection pool
+    get_llm_service.cache_clear()
+    reset_schema_mapper()
+
 
 # Main entry point
 if __name__ == "__main__":
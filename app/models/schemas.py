@@ -3,9 +3,12 @@ Schema repository and definitions
 Centralizes all customer schema metadata
 """
 import os
-from typing import Dict, Any, List
+import hashlib
+from types import MappingProxyType
+from typing import Dict, Any, List, Mapping, Optional
 from functools import lru_cache
 from pathlib import Path
+import orjson
 from app.core.exceptions import CustomerNotFoundError
 
 # Master Canonical Schema - Comprehensive and Stable
@@ -152,6 +155,11 @@ CANONICAL_SCHEMA = {
     }
 }
 
+# Membership indexes over the canonical schema, for entity/field checks
+# that don't need the descriptions
+CANONICAL_ENTITIES = frozenset(CANONICAL_SCHEMA)
+CANONICAL_FIELDS = {entity: frozenset(fields) for entity, fields in CANONICAL_SCHEMA.items()}
+
 
 # Client schema definitions
 # Each client is a tenant with their own customized database schema
@@ -308,6 +316,14 @@ CLIENT_SCHEMAS = {
 }
 
 
+def _fingerprint(schema: Dict[str, Any]) -> bytes:
+    """Stable 16-byte digest of a schema's sorted JSON form"""
+    return hashlib.blake2b(
+        orjson.dumps(schema, option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).digest()
+
+
 class SchemaRepository:
     """
     Repository for accessing client (tenant) schemas
@@ -322,23 +338,34 @@ class SchemaRepository:
             schemas: Client schemas dictionary (defaults to CLIENT_SCHEMAS)
         """
         self.schemas = schemas if schemas is not None else CLIENT_SCHEMAS
+        # Schemas are static per process; fingerprint each one on first use
+        self._fingerprints: Dict[str, bytes] = {}
+        self._canonical_fingerprint: Optional[bytes] = None
+        # Read-only views handed out by get_schema, built once per client
+        self._views: Dict[str, Mapping[str, Any]] = {}
 
-    def get_schema(self, client_id: str) -> Dict[str, Any]:
+    def get_schema(self, client_id: str) -> Mapping[str, Any]:
         """
         Get schema for a specific client (tenant)
 
+        Callers get a shared read-only view, so per-client data derived from
+        it (fingerprints, prompts, column roles) can't go stale by mutation.
+
         Args:
             client_id: Client identifier
 
         Returns:
-            Client schema dictionary
+            Read-only client schema mapping
 
         Raises:
             CustomerNotFoundError: If client_id not found
         """
-        if client_id not in self.schemas:
-            raise CustomerNotFoundError(client_id)
-        return self.schemas[client_id]
+        view = self._views.get(client_id)
+        if view is None:
+            if client_id not in self.schemas:
+                raise CustomerNotFoundError(client_id)
+            view = self._views[client_id] = MappingProxyType(self.schemas[client_id])
+        return view
 
     def get_canonical_schema(self) -> Dict[str, Any]:
         """
@@ -349,6 +376,69 @@ class SchemaRepository:
         """
         return CANONICAL_SCHEMA
 
+    def has_canonical_entity(self, entity: str) -> bool:
+        """
+        Check whether an entity is part of the canonical schema
+
+        Args:
+            entity: Canonical entity name (e.g. "contract")
+
+        Returns:
+            True if the entity exists
+        """
+        return entity in CANONICAL_ENTITIES
+
+    def has_canonical_field(self, entity: str, field: str) -> bool:
+        """
+        Check whether a field belongs to a canonical entity
+
+        Args:
+            entity: Canonical entity name
+            field: Field name within the entity
+
+        Returns:
+            True if the entity exists and defines the field
+        """
+        return field in CANONICAL_FIELDS.get(entity, ())
+
+    def get_schema_fingerprint(self, client_id: str) -> bytes:
+        """
+        Get a stable digest of a client's schema (computed once)
+
+        Args:
+            client_id: Client identifier
+
+        Returns:
+            16-byte digest of the schema's sorted JSON form
+
+        Raises:
+            CustomerNotFoundError: If client_id not found
+        """
+        fingerprint = self._fingerprints.get(client_id)
+        if fingerprint is None:
+            if client_id not in self.schemas:
+                raise CustomerNotFoundError(client_id)
+            fingerprint = _fingerprint(self.schemas[client_id])
+            self._fingerprints[client_id] = fingerprint
+        return fingerprint
+
+    def get_canonical_fingerprint(self) -> bytes:
+        """
+        Get a stable digest of the canonical schema (computed once)
+
+        Returns:
+            16-byte digest of the canonical schema's sorted JSON form
+        """
+        if self._canonical_fingerprint is None:
+            self._canonical_fingerprint = _fingerprint(self.get_canonical_schema())
+        return self._canonical_fingerprint
+
+    def clear_fingerprints(self) -> None:
+        """Invalidate cached fingerprints and views (call after schemas change)"""
+        self._fingerprints.clear()
+        self._canonical_fingerprint = None
+        self._views.clear()
+
     def list_clients(self) -> List[str]:
         """
         Get list of all client IDs
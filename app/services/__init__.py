@@ -2,7 +2,7 @@
 Business logic services
 """
 from .llm_service import LLMService, get_llm_service
-from .schema_mapper import SchemaMapper, get_schema_mapper
+from .schema_mapper import SchemaMapper, get_schema_mapper, init_schema_mapper, reset_schema_mapper
 from .query_executor import QueryExecutor, get_query_executor
 from .response_formatter import ResponseFormatter
 
@@ -11,6 +11,8 @@ __all__ = [
     "get_llm_service",
     "SchemaMapper",
     "get_schema_mapper",
+    "init_schema_mapper",
+    "reset_schema_mapper",
     "QueryExecutor",
     "get_query_executor",
     "ResponseFormatter"
@@ -2,9 +2,10 @@
 LLM Service with error resilience and retry logic
 Demonstrates proper error handling for external service calls
 """
-import json
 from typing import Dict, Any, Optional
 from functools import lru_cache
+import httpx
+import orjson
 from openai import AsyncAzureOpenAI
 from openai import (
     RateLimitError,
@@ -35,6 +36,7 @@ class LLMService:
     - Exponential backoff for rate limits
     - Proper error categorization
     - Timeout handling
+    - One pooled keep-alive HTTP client shared by all calls
     """
 
     def __init__(self, client: Optional[AsyncAzureOpenAI] = None):
@@ -47,14 +49,28 @@ class LLMService:
         self.settings = get_settings()
 
         if client is None:
+            # Reuse TCP/TLS connections across requests instead of
+            # handshaking per call
             self.client = AsyncAzureOpenAI(
                 api_key=self.settings.AZURE_OPENAI_API_KEY,
                 api_version=self.settings.AZURE_OPENAI_API_VERSION,
-                azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT
+                azure_endpoint=self.settings.AZURE_OPENAI_ENDPOINT,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.settings.LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=self.settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=self.settings.LLM_KEEPALIVE_EXPIRY_SECONDS
+                    ),
+                    timeout=self.settings.LLM_REQUEST_TIMEOUT
+                )
             )
         else:
             self.client = client
 
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool"""
+        await self.client.close()
+
     @retry(
         # Only retry transient errors
         retry=retry_if_exception_type((APIConnectionError, RateLimitError)),
@@ -67,7 +83,8 @@ class LLMService:
         self,
         messages: list,
         temperature: Optional[float] = None,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Generate completion with automatic retry
@@ -76,6 +93,7 @@ class LLMService:
             messages: OpenAI messages format
             temperature: Sampling temperature (defaults to config)
             max_tokens: Max tokens to generate (defaults to config)
+            timeout: Request timeout in seconds (defaults to config)
 
         Returns:
             Generated text content
@@ -89,7 +107,7 @@ class LLMService:
                 messages=messages,
                 temperature=temperature or self.settings.LLM_TEMPERATURE,
                 max_tokens=max_tokens or self.settings.LLM_MAX_TOKENS,
-                timeout=self.settings.LLM_REQUEST_TIMEOUT
+                timeout=timeout or self.settings.LLM_REQUEST_TIMEOUT
             )
 
             content = response.choices[0].message.content
@@ -138,27 +156,39 @@ class LLMService:
             LLMValidationError: If parsing fails
         """
         try:
-            # Strip markdown code blocks if present
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]  # Remove ```json
-            elif content.startswith("```"):
-                content = content[3:]  # Remove ```
-
-            if content.endswith("```"):
-                content = content[:-3]  # Remove closing ```
-
-            content = content.strip()
+            content = strip_code_fences(content)
 
-            data = json.loads(content)
+            data = orjson.loads(content)
             return data
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM JSON response: {content[:200]}")
             raise LLMValidationError(
                 f"LLM did not return valid JSON: {str(e)}"
             ) from e
 
 
+def strip_code_fences(content: str) -> str:
+    """
+    Strip surrounding markdown code fences from an LLM response
+
+    Args:
+        content: Raw LLM response
+
+    Returns:
+        Response body without ```json / ``` fences
+    """
+    content = content.strip()
+    if content.startswith("```json"):
+        content = content[7:]  # Remove ```json
+    elif content.startswith("```"):
+        content = content[3:]  # Remove ```
+
+    if content.endswith("```"):
+        content = content[:-3]  # Remove closing ```
+
+    return content.strip()
+
+
 @lru_cache()
 def get_llm_service() -> LLMService:
     """
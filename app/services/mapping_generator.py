@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import Dict, List, Any, Tuple, Optional
 from datetime import datetime
 
-from app.services.llm_service import LLMService
+from app.services.llm_service import LLMService, get_llm_service
 from app.models.mapping_schema import ClientMapping, FieldMapping, TableInfo, JoinDefinition, ValidationRules, MappingMetadata
 from app.core.logging import get_logger
 
@@ -26,9 +26,9 @@ class MappingGenerator:
         Initialize mapping generator
 
         Args:
-            llm_service: LLM service for semantic analysis (optional, creates new if not provided)
+            llm_service: LLM service for semantic analysis (optional, defaults to the shared instance)
         """
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or get_llm_service()
 
     async def generate_mapping(
         self,
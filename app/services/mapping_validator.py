@@ -8,7 +8,7 @@ Performs multi-level validation:
 import yaml
 import sqlite3
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 from datetime import date
 
 from app.models.mapping_schema import ClientMapping, MappingValidationResult
@@ -16,6 +16,9 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Parsed mappings by file, reused while the file's (mtime_ns, size) is unchanged
+_mapping_cache: Dict[Path, Tuple[Tuple[int, int], ClientMapping]] = {}
+
 
 class MappingValidator:
     """
@@ -58,6 +61,13 @@ class MappingValidator:
         if not mapping_file.exists():
             raise FileNotFoundError(f"Mapping file not found: {mapping_file}")
 
+        stat = mapping_file.stat()
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = _mapping_cache.get(mapping_file)
+        if cached is not None and cached[0] == version:
+            self.loaded_mappings[client_id] = cached[1]
+            return cached[1]
+
         logger.info(f"Loading mapping from {mapping_file}")
 
         # Load YAML
@@ -68,6 +78,7 @@ class MappingValidator:
         try:
             mapping = ClientMapping(**yaml_data)
             self.loaded_mappings[client_id] = mapping
+            _mapping_cache[mapping_file] = (version, mapping)
             logger.info(f"Successfully loaded and validated mapping for {client_id}")
             return mapping
         except Exception as e:
@@ -4,11 +4,14 @@ Demonstrates database connection management and error handling
 
 Supports both SQLite (for demo) and SQL Server (for production)
 """
+import asyncio
+import os
 import sqlite3
+import sys
+import threading
 import pyodbc
-import aiosqlite
 import aioodbc
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from functools import lru_cache
 from pathlib import Path
 
@@ -20,6 +23,15 @@ from app.models.schemas import SchemaRepository, get_schema_repository
 
 logger = get_logger(__name__)
 
+# Expected network/IO failures; logged without a stack trace.
+# OSError covers ConnectionResetError, BrokenPipeError, etc.
+_TRANSIENT_ERRORS = (asyncio.TimeoutError, OSError)
+
+# Per-thread SQLite connections, reused across queries run via asyncio.to_thread
+_sqlite_local = threading.local()
+# Bumped to make every thread drop its cached SQLite connections on next use
+_sqlite_generation = 0
+
 
 class QueryExecutor:
     """
@@ -40,6 +52,8 @@ class QueryExecutor:
         """
         self.settings = get_settings()
         self.schema_repo = schema_repo or get_schema_repository()
+        # Connection configs are static per process; resolve each client once
+        self._connection_cache: Dict[str, Dict[str, Any]] = {}
 
     async def execute_query(
         self,
@@ -72,16 +86,15 @@ class QueryExecutor:
         # Sanitize SQL query
         sql_query = SQLValidator.sanitize(sql_query)
 
-        # Get customer schema
-        customer_schema = self.schema_repo.get_schema(client_id)
-        customer_config = customer_schema["connection"]
+        # Get customer connection config (cached per client)
+        customer_config = self._get_connection_config(client_id)
 
         # Determine database type and execute accordingly
         db_type = customer_config.get("type", "sql_server")
 
         try:
             if db_type == "sqlite":
-                return await self._execute_on_sqlite(customer_config, sql_query)
+                return await self._execute_on_sqlite(client_id, customer_config, sql_query)
             else:
                 conn_str = self._build_connection_string(customer_config)
                 return await self._execute_on_sqlserver(conn_str, sql_query)
@@ -95,6 +108,13 @@ class QueryExecutor:
                 f"Falling back to mock data."
             )
             return self._get_mock_data(client_id, sql_query)
+        except _TRANSIENT_ERRORS as e:
+            # Known transient errors - skip the costly traceback capture
+            logger.warning(
+                f"Transient error for {client_id} ({type(e).__name__}): {e}. "
+                f"Falling back to mock data."
+            )
+            return self._get_mock_data(client_id, sql_query)
         except Exception as e:
             # Unexpected errors - log with full stack trace
             logger.error(
@@ -104,6 +124,48 @@ class QueryExecutor:
             # Still fallback to mock data for demo purposes
             return self._get_mock_data(client_id, sql_query)
 
+    def _get_connection_config(self, client_id: str) -> Dict[str, Any]:
+        """
+        Get connection configuration for a client, memoized per executor
+
+        Args:
+            client_id: Customer identifier
+
+        Returns:
+            Connection configuration dictionary
+
+        Raises:
+            CustomerNotFoundError: If customer not found
+        """
+        config = self._connection_cache.get(client_id)
+        if config is None:
+            config = self.schema_repo.get_schema(client_id)["connection"]
+            self._connection_cache[client_id] = config
+        return config
+
+    def clear_connection_cache(self, client_id: Optional[str] = None) -> None:
+        """
+        Invalidate cached connection configs (e.g. after schemas are reloaded)
+
+        Args:
+            client_id: Client to invalidate (defaults to all clients)
+        """
+        if client_id is None:
+            self._connection_cache.clear()
+        else:
+            self._connection_cache.pop(client_id, None)
+
+    def close_sqlite_connections(self) -> None:
+        """
+        Discard cached SQLite connections (e.g. after databases are rebuilt)
+
+        sqlite3 connections can only be closed by the thread that opened
+        them, so each worker thread closes its own on its next query; idle
+        threads release theirs when they exit.
+        """
+        global _sqlite_generation
+        _sqlite_generation += 1
+
     def _build_connection_string(
         self,
         config: Dict[str, str]
@@ -130,13 +192,18 @@ class QueryExecutor:
 
     async def _execute_on_sqlite(
         self,
+        client_id: str,
         config: Dict[str, str],
         sql_query: str
     ) -> List[Dict[str, Any]]:
         """
         Execute query on SQLite database
 
+        Runs the blocking sqlite3 call on a worker thread; small demo queries
+        finish faster this way than through aiosqlite's per-connection queue.
+
         Args:
+            client_id: Customer identifier
             config: Database configuration
             sql_query: SQL query
 
@@ -150,25 +217,74 @@ class QueryExecutor:
                 f"SQLite database not found: {db_path}"
             )
 
-        async with aiosqlite.connect(db_path) as conn:
-            conn.row_factory = aiosqlite.Row  # Return rows as dictionaries
-            cursor = await conn.cursor()
+        results = await asyncio.to_thread(
+            self._execute_sqlite_sync,
+            db_path,
+            sql_query,
+            self.settings.SQLITE_MMAP_SIZE
+        )
+        logger.info(f"SQLite query returned {len(results)} rows")
+
+        # In demo/development mode, if database is empty, fallback to mock data
+        # This makes the demo work even if databases aren't populated
+        if len(results) == 0 and (self.settings.ENV == "development" or self.settings.DEBUG):
+            logger.info(f"Database empty for {client_id}, using mock data for demo")
+            return self._get_mock_data(client_id, sql_query)
 
-            try:
-                await cursor.execute(sql_query)
-                rows = await cursor.fetchall()
-                results = [dict(row) for row in rows]
-                logger.info(f"SQLite query returned {len(results)} rows")
-                
-                # In demo/development mode, if database is empty, fallback to mock data
-                # This makes the demo work even if databases aren't populated
-                if len(results) == 0 and (self.settings.ENV == "development" or self.settings.DEBUG):
-                    logger.info(f"Database empty for {client_id}, using mock data for demo")
-                    return self._get_mock_data(client_id, sql_query)
-                
-                return results
-            finally:
-                await cursor.close()
+        return results
+
+    @staticmethod
+    def _execute_sqlite_sync(
+        db_path: Path,
+        sql_query: str,
+        mmap_size: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a query on a thread-local cached SQLite connection
+
+        Args:
+            db_path: Path to SQLite database file
+            sql_query: SQL query
+            mmap_size: Bytes of the file SQLite may memory-map for reads
+
+        Returns:
+            Query results as list of dictionaries
+        """
+        if getattr(_sqlite_local, "generation", None) != _sqlite_generation:
+            for conn, _ in getattr(_sqlite_local, "connections", {}).values():
+                conn.close()
+            _sqlite_local.connections = {}
+            _sqlite_local.generation = _sqlite_generation
+        connections = _sqlite_local.connections
+
+        # A file replaced on disk gets a new inode; a handle opened on the old
+        # one would keep reading the old data
+        stat = os.stat(db_path)
+        file_id = (stat.st_dev, stat.st_ino)
+
+        cached = connections.get(db_path)
+        if cached is not None and cached[1] != file_id:
+            cached[0].close()
+            cached = None
+
+        if cached is None:
+            conn = sqlite3.connect(db_path)
+            if mmap_size > 0:
+                # Read pages through the kernel page cache instead of read() copies
+                conn.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+            connections[db_path] = (conn, file_id)
+        else:
+            conn = cached[0]
+
+        cursor = conn.execute(sql_query)
+        try:
+            if cursor.description is None:
+                return []
+            # Interned column names are shared (with cached hashes) by every row dict
+            columns = tuple(sys.intern(column[0]) for column in cursor.description)
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
 
     async def _execute_on_sqlserver(
         self,
@@ -189,14 +305,12 @@ class QueryExecutor:
             cursor = await conn.cursor()
             await cursor.execute(sql_query)
 
-            # Get column names
-            columns = [column[0] for column in cursor.description]
+            # Get column names (interned so every row dict shares the key objects)
+            columns = tuple(sys.intern(column[0]) for column in cursor.description)
 
             # Fetch results
             rows = await cursor.fetchall()
-            results = []
-            for row in rows:
-                results.append(dict(zip(columns, row)))
+            results = [dict(zip(columns, row)) for row in rows]
 
             logger.info(f"SQL Server query returned {len(results)} rows")
             return results
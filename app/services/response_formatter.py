@@ -2,12 +2,15 @@
 Response formatting service
 Converts query results into natural language responses
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, FrozenSet
 
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Columns preferred as the comparison-table grouping key, even when numeric
+_GROUPING_HINT_KEYS: FrozenSet[str] = frozenset({"region", "customer", "status", "quarter"})
+
 
 class ResponseFormatter:
     """
@@ -96,7 +99,7 @@ class ResponseFormatter:
         # Find the grouping key (usually the first non-numeric field)
         group_key = None
         for key, value in clean_sample.items():
-            if not isinstance(value, (int, float)) or key in ['region', 'customer', 'status', 'quarter']:
+            if not isinstance(value, (int, float)) or key in _GROUPING_HINT_KEYS:
                 group_key = key
                 break
 
@@ -115,6 +118,10 @@ class ResponseFormatter:
         # Sort groups
         sorted_groups = sorted(all_groups, key=lambda x: str(x) if x is not None else "")
 
+        # Rows normally share a few column layouts, so resolve the visible
+        # columns once per layout (exact key order) instead of once per row
+        public_keys_by_layout: Dict[tuple, tuple] = {}
+
         # For each group value, show comparison across clients
         for group_val in sorted_groups:
             lines.append(f"\n**{group_key.replace('_', ' ').title()}: {group_val}**")
@@ -124,8 +131,13 @@ class ResponseFormatter:
                 matching = [r for r in client_results if r.get(group_key) == group_val]
                 if matching:
                     row = matching[0]
-                    clean_row = {k: v for k, v in row.items() if not k.startswith("_") and k != group_key}
-                    details = ", ".join([f"{k}: {v}" for k, v in clean_row.items()])
+                    layout = tuple(row)
+                    public_keys = public_keys_by_layout.get(layout)
+                    if public_keys is None:
+                        public_keys = public_keys_by_layout[layout] = tuple(
+                            k for k in layout if not k.startswith("_") and k != group_key
+                        )
+                    details = ", ".join(f"{k}: {row[k]}" for k in public_keys)
                     lines.append(f"  • {client_id.replace('_', ' ').title()}: {details}")
 
         return "\n".join(lines)
@@ -170,16 +182,21 @@ class ResponseFormatter:
         """
         lines = [f"\n**{client_id.replace('_', ' ').title()}:**"]
 
+        # Internal fields (prefixed with "_") are hidden; rows from one client
+        # normally share the same columns, so compute the visible ones once
+        # per layout (exact key order) rather than once per row
+        public_keys_by_layout: Dict[tuple, tuple] = {}
+
         # Format each result (limit to 10 for readability)
         for i, result in enumerate(results[:10], 1):
-            # Remove internal fields
-            clean_result = {
-                k: v for k, v in result.items()
-                if not k.startswith("_")
-            }
-
+            layout = tuple(result)
+            keys = public_keys_by_layout.get(layout)
+            if keys is None:
+                keys = public_keys_by_layout[layout] = tuple(
+                    k for k in layout if not k.startswith("_")
+                )
             # Format as bullet points
-            details = ", ".join([f"{k}: {v}" for k, v in clean_result.items()])
+            details = ", ".join(f"{k}: {result[k]}" for k in keys)
             lines.append(f"  {i}. {details}")
 
         if len(results) > 10:
@@ -2,22 +2,93 @@
 Schema mapping service - orchestrates AI-powered schema translation
 Demonstrates separation of concerns and dependency injection
 """
-import json
+import asyncio
+import copy
+import random
 import re
-from typing import Dict, Any
-from functools import lru_cache
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple, Union
 import hashlib
+import orjson
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 
+from app.core.config import get_settings
 from app.core.logging import get_logger
 from app.core.exceptions import LLMValidationError, LLMGenerationError
 from app.models.schemas import SchemaRepository, get_schema_repository
-from app.services.llm_service import LLMService, get_llm_service
+from app.services.llm_service import LLMService, get_llm_service, strip_code_fences
 
 logger = get_logger(__name__)
 
-# Simple async-compatible cache for LLM results
-_llm_cache: Dict[str, str] = {}
+# Bounded LRU cache for LLM results (most recently used entries at the end)
+_llm_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
 _cache_stats = {"hits": 0, "misses": 0}
+# In-flight LLM requests by cache key, so concurrent identical misses share one call
+_inflight: Dict[bytes, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+def _consume_exception(task: "asyncio.Task[Any]") -> None:
+    """Mark a finished task's exception retrieved (its callers may all be gone)"""
+    if not task.cancelled():
+        task.exception()
+
+
+class MappingResponse(BaseModel):
+    """Mapping the LLM must return for one question"""
+    model_config = ConfigDict(extra="ignore")
+
+    sql_query: str
+    mappings: Dict[str, Any]
+    calculations: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    explanation: str
+
+    @field_validator("calculations", mode="before")
+    @classmethod
+    def _null_calculations_to_empty(cls, value: Any) -> Any:
+        """LLMs often send "calculations": null when nothing needs computing"""
+        return {} if value is None else value
+
+
+# Rule-based fallback: question intents, scanned in one pass. The lookahead
+# reports overlapping hits, matching plain substring tests ("inactive" -> "active")
+_QUESTION_INTENT_RE = re.compile(
+    r"(?=(total|value|region|average|annual|customer|expir|active|compare|vs|quarter|2025))"
+)
+
+# Rule-based fallback: semantic column roles, matched against lowercased names
+_COLUMN_ROLE_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    "value": re.compile(r"value|amount|price|cost"),
+    "region": re.compile(r"region|location|area"),
+    "annual": re.compile(r"annual|revenue|value|amount"),
+    "customer": re.compile(r"customer|client|account"),
+    "expiry": re.compile(r"expir|end|terminat"),
+    "status_or_state": re.compile(r"status|state"),
+    "status": re.compile(r"status"),
+}
+
+
+def _describe_validation_error(error: ValidationError) -> str:
+    """Summarize a MappingResponse validation error on one line"""
+    problems = "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'response'}: {err['msg']}"
+        for err in error.errors()
+    )
+    return f"LLM mapping failed validation: {problems}"
+
+
+def _dumps_compact(data: Any) -> str:
+    """Serialize to compact JSON for prompts (whitespace only costs input tokens)"""
+    return orjson.dumps(data).decode()
+
+
+def _index_column_roles(col_names: List[str]) -> Dict[str, Optional[str]]:
+    """Map each semantic role to the first column whose name matches it"""
+    columns_lower = [(col, col.lower()) for col in col_names]
+    return {
+        role: next((col for col, col_lower in columns_lower if pattern.search(col_lower)), None)
+        for role, pattern in _COLUMN_ROLE_PATTERNS.items()
+    }
 
 
 class SchemaMapper:
@@ -42,8 +113,74 @@ class SchemaMapper:
             schema_repo: Schema repository (injected for testing)
             llm_service: LLM service (injected for testing)
         """
+        self.settings = get_settings()
         self.schema_repo = schema_repo or get_schema_repository()
         self.llm_service = llm_service or get_llm_service()
+        # Static start of every prompt, kept byte-identical for provider prefix
+        # caching: the shared canonical block, then each client's schema block
+        self._canonical_block: Optional[str] = None
+        self._prompt_prefixes: Dict[str, str] = {}
+        # Rule-based fallback: per-client column chosen for each semantic role
+        self._column_roles: Dict[str, Dict[str, Optional[str]]] = {}
+        # Cache-miss questions waiting to be sent to the LLM together, per client
+        self._batches: Dict[str, List[Tuple[str, "asyncio.Future[Dict[str, Any]]"]]] = {}
+        self._batch_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._batch_tasks: set = set()
+
+    def warm_caches(self) -> None:
+        """Precompute fingerprints, prompt prefixes and column roles for every client"""
+        canonical_schema = self.schema_repo.get_canonical_schema()
+        self.schema_repo.get_canonical_fingerprint()
+        for client_id in self.schema_repo.list_clients():
+            customer_schema = self.schema_repo.get_schema(client_id)
+            self.schema_repo.get_schema_fingerprint(client_id)
+            self._get_prompt_prefix(client_id, customer_schema, canonical_schema)
+            self._get_column_roles(client_id, customer_schema)
+
+    def clear_schema_caches(self) -> None:
+        """Invalidate prompt prefixes and column roles (call after reloading schemas)"""
+        self._canonical_block = None
+        self._prompt_prefixes.clear()
+        self._column_roles.clear()
+
+    def _get_prompt_prefix(
+        self,
+        client_id: str,
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> str:
+        """
+        Get the instructions + schema blocks that open every prompt for a client
+
+        Built once per client and reused verbatim, so no schema is serialized
+        on the request path and the LLM provider can serve the shared prefix
+        from its prompt cache.
+
+        Args:
+            client_id: Customer identifier
+            customer_schema: Customer schema
+            canonical_schema: Canonical schema
+
+        Returns:
+            Prompt prefix string
+        """
+        prefix = self._prompt_prefixes.get(client_id)
+        if prefix is None:
+            if self._canonical_block is None:
+                self._canonical_block = (
+                    "You are a database schema expert. "
+                    "Users want to query a customer's database.\n\n"
+                    "Canonical Schema (our standard):\n"
+                    f"{_dumps_compact(canonical_schema)}\n\n"
+                )
+            prefix = (
+                f"{self._canonical_block}"
+                "Customer Schema:\n"
+                f"{_dumps_compact(customer_schema['tables'])}\n\n"
+                f"Semantic Context: {customer_schema.get('semantic_context', 'None provided')}\n\n"
+            )
+            self._prompt_prefixes[client_id] = prefix
+        return prefix
 
     async def get_mapping(
         self,
@@ -114,46 +251,392 @@ class SchemaMapper:
         self,
         client_id: str,
         user_question: str,
-        customer_schema_json: str,
-        canonical_schema_json: str
-    ) -> str:
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
         """
-        Cached LLM mapping generation (returns JSON string for caching)
+        Cached LLM mapping generation (returns the shared cached mapping)
 
         Args:
             client_id: Customer identifier
             user_question: User's question
-            customer_schema_json: Customer schema as JSON string
-            canonical_schema_json: Canonical schema as JSON string
+            customer_schema: Customer's schema
+            canonical_schema: Canonical schema
 
         Returns:
-            Mapping as JSON string
+            Validated mapping dictionary
         """
-        # Create cache key from inputs
-        cache_key = hashlib.sha256(
-            f"{client_id}:{user_question}:{customer_schema_json}:{canonical_schema_json}".encode()
-        ).hexdigest()
+        # Create cache key from inputs; schemas contribute precomputed digests
+        cache_key = hashlib.blake2b(
+            f"{client_id}\0{user_question}\0".encode()
+            + self.schema_repo.get_schema_fingerprint(client_id)
+            + self.schema_repo.get_canonical_fingerprint(),
+            digest_size=16
+        ).digest()
         
         # Check cache first
-        if cache_key in _llm_cache:
+        cached = _llm_cache.get(cache_key)
+        if cached is not None:
             _cache_stats["hits"] += 1
+            _llm_cache.move_to_end(cache_key)
             logger.debug(f"Cache hit for {client_id}: {user_question[:50]}")
-            return _llm_cache[cache_key]
-        
+            return cached
+
+        # Join an identical request that is already waiting on the LLM
+        pending = _inflight.get(cache_key)
+        if pending is not None:
+            _cache_stats["hits"] += 1
+            logger.debug(f"Joining in-flight LLM request for {client_id}: {user_question[:50]}")
+            return await asyncio.shield(pending)
+
         _cache_stats["misses"] += 1
-        
-        customer_schema = json.loads(customer_schema_json)
-        canonical_schema = json.loads(canonical_schema_json)
 
+        # The LLM call runs in its own task: a cancelled caller only stops
+        # waiting, and callers that joined it still get the mapping
+        task = asyncio.create_task(self._fill_cache(
+            cache_key,
+            client_id,
+            user_question,
+            customer_schema,
+            canonical_schema
+        ))
+        _inflight[cache_key] = task
+        task.add_done_callback(_consume_exception)
+        return await asyncio.shield(task)
+
+    async def _fill_cache(
+        self,
+        cache_key: bytes,
+        client_id: str,
+        user_question: str,
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Generate a mapping and store it in the LLM cache
+
+        Args:
+            cache_key: Key of the cache entry to fill
+            client_id: Customer identifier
+            user_question: User's question
+            customer_schema: Customer's schema
+            canonical_schema: Canonical schema
+
+        Returns:
+            Validated mapping dictionary
+        """
+        try:
+            mapping = await self._request_ai_mapping(
+                client_id,
+                user_question,
+                customer_schema,
+                canonical_schema
+            )
+        finally:
+            del _inflight[cache_key]
+
+        # Cache the result, evicting least recently used
+        _llm_cache[cache_key] = mapping
+        while len(_llm_cache) > self.settings.LLM_CACHE_MAX_ENTRIES:
+            _llm_cache.popitem(last=False)
+
+        return mapping
+
+    async def _request_ai_mapping(
+        self,
+        client_id: str,
+        user_question: str,
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Queue a question for the client's next LLM batch and await its mapping
+
+        Misses arriving within LLM_BATCH_WINDOW_MS of each other share one
+        prompt (up to _batch_limit()), saving round trips and the
+        repeated schema tokens under rate limits.
+
+        Args:
+            client_id: Customer identifier
+            user_question: User's question
+            customer_schema: Customer's schema
+            canonical_schema: Canonical schema
+
+        Returns:
+            Validated mapping dictionary
+
+        Raises:
+            LLMValidationError: If the response is not a valid mapping
+        """
+        limit = self._batch_limit()
+        if limit <= 1:
+            return await self._generate_mapping(
+                client_id, user_question, customer_schema, canonical_schema
+            )
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._batches.setdefault(client_id, [])
+        batch.append((user_question, future))
+
+        if len(batch) >= limit:
+            self._start_batch(client_id, customer_schema, canonical_schema)
+        elif len(batch) == 1:
+            self._batch_timers[client_id] = loop.call_later(
+                self.settings.LLM_BATCH_WINDOW_MS / 1000,
+                self._start_batch,
+                client_id,
+                customer_schema,
+                canonical_schema
+            )
+
+        return await future
+
+    def _batch_limit(self) -> int:
+        """
+        Most questions one batched call may carry
+
+        Capped so the batch's output budget (LLM_MAX_TOKENS per question)
+        stays within LLM_BATCH_MAX_TOKENS; larger bursts are split into
+        several batches instead of truncating every answer.
+
+        Returns:
+            Batch size (1 means batching is off)
+        """
+        by_tokens = self.settings.LLM_BATCH_MAX_TOKENS // self.settings.LLM_MAX_TOKENS
+        return max(1, min(self.settings.LLM_BATCH_MAX_QUESTIONS, by_tokens))
+
+    def _start_batch(
+        self,
+        client_id: str,
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> None:
+        """
+        Close the client's pending batch and send it to the LLM in the background
+
+        Args:
+            client_id: Customer identifier
+            customer_schema: Customer's schema
+            canonical_schema: Canonical schema
+        """
+        timer = self._batch_timers.pop(client_id, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(client_id, None)
+        if not batch:
+            return
+
+        task = asyncio.create_task(
+            self._run_batch(client_id, batch, customer_schema, canonical_schema)
+        )
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(
+        self,
+        client_id: str,
+        batch: List[Tuple[str, "asyncio.Future[Dict[str, Any]]"]],
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> None:
+        """
+        Generate mappings for a batch and resolve each caller's future
+
+        Args:
+            client_id: Customer identifier
+            batch: (question, future) pairs in arrival order
+            customer_schema: Customer's schema
+            canonical_schema: Canonical schema
+        """
+        questions = [question for question, _ in batch]
+        results: List[Union[Dict[str, Any], Exception]]
+        try:
+            if len(questions) == 1:
+                results = [await self._generate_mapping(
+                    client_id, questions[0], customer_schema, canonical_schema
+                )]
+            else:
+                results = await self._generate_batched_mappings(
+                    client_id, questions, customer_schema, canonical_schema
+                )
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue  # Caller was cancelled
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: Optional[int] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Call the LLM with a per-attempt timeout, retrying stalled calls
+
+        A long-tail response is usually slower than simply asking again, so
+        each attempt is capped and retried with exponential backoff + jitter.
+
+        Args:
+            messages: OpenAI messages format
+            max_tokens: Max tokens to generate (defaults to config)
+            timeout: Per-attempt timeout in seconds (defaults to config)
+
+        Returns:
+            Generated text content
+
+        Raises:
+            LLMGenerationError: If every attempt timed out
+        """
+        timeout = timeout or self.settings.LLM_ATTEMPT_TIMEOUT_SECONDS
+        attempts = self.settings.LLM_TIMEOUT_RETRIES + 1
+
+        for attempt in range(attempts):
+            try:
+                return await asyncio.wait_for(
+                    # The HTTP request gets the same budget, so a long batched
+                    # call isn't cut short by the client's default timeout
+                    self.llm_service.generate_completion(
+                        messages, max_tokens=max_tokens, timeout=timeout
+                    ),
+                    timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"LLM call timed out after {timeout}s "
+                    f"(attempt {attempt + 1}/{attempts})"
+                )
+                if attempt + 1 < attempts:
+                    await asyncio.sleep(random.uniform(
+                        0, self.settings.LLM_TIMEOUT_BACKOFF_SECONDS * 2 ** attempt
+                    ))
+
+        raise LLMGenerationError(f"LLM call timed out after {attempts} attempts")
+
+    async def _generate_mapping(
+        self,
+        client_id: str,
+        user_question: str,
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Call the LLM for a single question and validate its mapping (uncached)
+
+        Args:
+            client_id: Customer identifier
+            user_question: User's question
+            customer_schema: Customer's schema
+            canonical_schema: Canonical schema
+
+        Returns:
+            Validated mapping dictionary
+
+        Raises:
+            LLMValidationError: If the response is not a valid mapping
+        """
         # Build prompt
         prompt = self._build_mapping_prompt(
+            client_id,
             user_question,
             customer_schema,
             canonical_schema
         )
 
         # Call LLM (with automatic retry)
-        messages = [
+        response_content = await self._complete(self._build_messages(prompt))
+
+        # Parse and validate response in one pass
+        mapping = self._validate_mapping_json(strip_code_fences(response_content))
+
+        logger.info(
+            f"Successfully generated AI mapping for {client_id}: "
+            f"{mapping['explanation']}"
+        )
+
+        return mapping
+
+    async def _generate_batched_mappings(
+        self,
+        client_id: str,
+        questions: List[str],
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """
+        Call the LLM once for several questions against the same schema
+
+        Args:
+            client_id: Customer identifier
+            questions: User questions, in order
+            customer_schema: Customer's schema
+            canonical_schema: Canonical schema
+
+        Returns:
+            One entry per question: validated mapping, or the validation
+            error for that question
+
+        Raises:
+            LLMValidationError: If the response is not an array of the right length
+        """
+        prompt = self._build_batched_mapping_prompt(
+            client_id,
+            questions,
+            customer_schema,
+            canonical_schema
+        )
+
+        # Each answer needs its own output budget (and time to generate it),
+        # within the deployment's completion limit and a sane wait
+        response_content = await self._complete(
+            self._build_messages(prompt),
+            max_tokens=min(
+                self.settings.LLM_MAX_TOKENS * len(questions),
+                self.settings.LLM_BATCH_MAX_TOKENS
+            ),
+            timeout=min(
+                self.settings.LLM_ATTEMPT_TIMEOUT_SECONDS * len(questions),
+                self.settings.LLM_BATCH_MAX_TIMEOUT_SECONDS
+            )
+        )
+
+        mappings = self.llm_service.parse_json_response(response_content)
+        if not isinstance(mappings, list) or len(mappings) != len(questions):
+            raise LLMValidationError(
+                f"LLM batch response must be a JSON array of {len(questions)} mappings"
+            )
+
+        results: List[Union[Dict[str, Any], Exception]] = []
+        for mapping in mappings:
+            try:
+                results.append(self._validate_mapping(mapping))
+            except LLMValidationError as e:
+                results.append(e)
+
+        logger.info(
+            f"Generated {len(questions)} AI mappings for {client_id} in one LLM call"
+        )
+
+        return results
+
+    @staticmethod
+    def _build_messages(prompt: str) -> List[Dict[str, str]]:
+        """
+        Wrap a mapping prompt in the chat messages sent to the LLM
+
+        Args:
+            prompt: User prompt
+
+        Returns:
+            OpenAI messages list
+        """
+        return [
             {
                 "role": "system",
                 "content": "You are a SQL and schema mapping expert. "
@@ -162,34 +645,43 @@ class SchemaMapper:
             {"role": "user", "content": prompt}
         ]
 
-        response_content = await self.llm_service.generate_completion(messages)
+    @staticmethod
+    def _validate_mapping(mapping: Any) -> Dict[str, Any]:
+        """
+        Check an LLM mapping has the required fields
 
-        # Parse and validate response
-        mapping = self.llm_service.parse_json_response(response_content)
+        Args:
+            mapping: Parsed mapping from the LLM
 
-        # Validate required fields
-        required_fields = ["sql_query", "mappings", "explanation"]
-        missing = [f for f in required_fields if f not in mapping]
-        if missing:
-            raise LLMValidationError(
-                f"LLM response missing required fields: {missing}"
-            )
+        Returns:
+            The mapping, with an empty calculations field added if missing
 
-        # Ensure calculations field exists
-        if "calculations" not in mapping:
-            mapping["calculations"] = {}
+        Raises:
+            LLMValidationError: If the mapping is malformed
+        """
+        try:
+            return MappingResponse.model_validate(mapping).model_dump()
+        except ValidationError as e:
+            raise LLMValidationError(_describe_validation_error(e)) from e
 
-        logger.info(
-            f"Successfully generated AI mapping for {client_id}: "
-            f"{mapping['explanation']}"
-        )
+    @staticmethod
+    def _validate_mapping_json(content: str) -> Dict[str, Any]:
+        """
+        Parse and validate a raw JSON mapping from the LLM
 
-        # Convert to JSON string and cache it
-        mapping_json = json.dumps(mapping)
-        _llm_cache[cache_key] = mapping_json
-        
-        # Return as JSON string for caching
-        return mapping_json
+        Args:
+            content: LLM response with code fences removed
+
+        Returns:
+            The mapping, with an empty calculations field added if missing
+
+        Raises:
+            LLMValidationError: If the response is not valid JSON or is malformed
+        """
+        try:
+            return MappingResponse.model_validate_json(content).model_dump()
+        except ValidationError as e:
+            raise LLMValidationError(_describe_validation_error(e)) from e
 
     async def _get_ai_mapping(
         self,
@@ -210,36 +702,32 @@ class SchemaMapper:
         Returns:
             Mapping dictionary with SQL and explanations
         """
-        # Convert schemas to JSON strings for cache key
-        customer_schema_json = json.dumps(customer_schema, sort_keys=True)
-        canonical_schema_json = json.dumps(canonical_schema, sort_keys=True)
-
         # Get cached result (or generate new one)
         logger.debug(f"Checking cache for {client_id}: {user_question[:50]}...")
-        mapping_json = await self._get_cached_ai_mapping(
+        mapping = await self._get_cached_ai_mapping(
             client_id,
             user_question,
-            customer_schema_json,
-            canonical_schema_json
+            customer_schema,
+            canonical_schema
         )
 
-        # Check cache info
+        # Log cache stats on a sampled interval, not every request (<= 0 disables)
+        interval = self.settings.LLM_CACHE_STATS_LOG_INTERVAL
         total = _cache_stats["hits"] + _cache_stats["misses"]
-        if total > 0:
+        if interval > 0 and total % interval == 0:
             hit_rate = _cache_stats["hits"] / total * 100
             logger.info(
                 f"LLM cache stats - hits: {_cache_stats['hits']}, "
                 f"misses: {_cache_stats['misses']}, "
                 f"hit_rate: {hit_rate:.1f}%"
             )
-        else:
-            logger.info("LLM cache stats - first call")
 
-        # Parse back to dictionary
-        return json.loads(mapping_json)
+        # Deep copy so callers can't alter the cached entry (or its nested dicts)
+        return copy.deepcopy(mapping)
 
     def _build_mapping_prompt(
         self,
+        client_id: str,
         user_question: str,
         customer_schema: Dict[str, Any],
         canonical_schema: Dict[str, Any]
@@ -248,6 +736,7 @@ class SchemaMapper:
         Build prompt for LLM to generate schema mapping
 
         Args:
+            client_id: Customer identifier
             user_question: User's question
             customer_schema: Customer schema
             canonical_schema: Canonical schema
@@ -255,17 +744,7 @@ class SchemaMapper:
         Returns:
             Formatted prompt string
         """
-        return f"""You are a database schema expert. A user wants to query a customer's database.
-
-User Question: {user_question}
-
-Canonical Schema (our standard):
-{json.dumps(canonical_schema, indent=2)}
-
-Customer Schema:
-{json.dumps(customer_schema['tables'], indent=2)}
-
-Semantic Context: {customer_schema.get('semantic_context', 'None provided')}
+        return f"""{self._get_prompt_prefix(client_id, customer_schema, canonical_schema)}User Question: {user_question}
 
 Based on the user's question, provide:
 1. The SQL query to execute on the customer's actual schema
@@ -287,6 +766,75 @@ Respond in JSON format:
 }}
 """
 
+    def _build_batched_mapping_prompt(
+        self,
+        client_id: str,
+        questions: List[str],
+        customer_schema: Dict[str, Any],
+        canonical_schema: Dict[str, Any]
+    ) -> str:
+        """
+        Build one prompt asking the LLM to map several questions
+
+        Args:
+            client_id: Customer identifier
+            questions: User questions, in order
+            customer_schema: Customer schema
+            canonical_schema: Canonical schema
+
+        Returns:
+            Formatted prompt string
+        """
+        numbered = "\n".join(f"{i}. {q}" for i, q in enumerate(questions, 1))
+        return f"""{self._get_prompt_prefix(client_id, customer_schema, canonical_schema)}User Questions:
+{numbered}
+
+For EACH question, provide:
+1. The SQL query to execute on the customer's actual schema
+2. Semantic mappings explaining how customer fields map to canonical concepts
+3. Any calculations needed (e.g., if customer stores annual value but user asks for total value)
+
+Respond with a JSON array containing exactly {len(questions)} objects, one per question, in the same order:
+[
+    {{
+        "sql_query": "SELECT ... FROM ...",
+        "mappings": {{
+            "canonical_field": "customer_field",
+            ...
+        }},
+        "calculations": {{
+            "field": "calculation description",
+            ...
+        }},
+        "explanation": "Brief explanation of the mapping"
+    }},
+    ...
+]
+"""
+
+    def _get_column_roles(
+        self,
+        client_id: str,
+        customer_schema: Dict[str, Any]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Get the main table's column for each semantic role, indexed once per client
+
+        Args:
+            client_id: Customer identifier
+            customer_schema: Customer schema
+
+        Returns:
+            Role -> column name (None when no column matches)
+        """
+        roles = self._column_roles.get(client_id)
+        if roles is None:
+            tables = customer_schema['tables']
+            main_table_cols = next(iter(tables.values()), {}).get('columns', {}) if tables else {}
+            roles = _index_column_roles(list(main_table_cols) if main_table_cols else [])
+            self._column_roles[client_id] = roles
+        return roles
+
     def _get_rule_based_mapping(
         self,
         client_id: str,
@@ -325,92 +873,74 @@ Respond in JSON format:
         db_type = customer_schema.get("connection", {}).get("type", "sqlite")
         is_sqlite = db_type == "sqlite"
 
-        # Get available columns from the main table
-        main_table_cols = customer_schema['tables'].get(main_table, {}).get('columns', {})
-        col_names = list(main_table_cols.keys()) if main_table_cols else []
+        # Main-table columns by semantic role, indexed once per client
+        roles = self._get_column_roles(client_id, customer_schema)
+
+        # Pull every question intent in one scan
+        intents = set(_QUESTION_INTENT_RE.findall(question_lower))
 
         # Build SELECT clause - try to identify relevant columns
         select_cols = []
-        if "total" in question_lower and "value" in question_lower:
+        if "total" in intents and "value" in intents:
             # Aggregate query - look for value columns
-            for col in col_names:
-                if any(keyword in col.lower() for keyword in ['value', 'amount', 'price', 'cost']):
-                    select_cols.append(col)
-                    break
-            if "region" in question_lower:
-                for col in col_names:
-                    if any(keyword in col.lower() for keyword in ['region', 'location', 'area']):
-                        select_cols.append(col)
-                        break
-        elif "average" in question_lower or "annual" in question_lower:
-            for col in col_names:
-                if any(keyword in col.lower() for keyword in ['annual', 'revenue', 'value', 'amount']):
+            col = roles["value"]
+            if col:
+                select_cols.append(col)
+            if "region" in intents:
+                col = roles["region"]
+                if col:
                     select_cols.append(col)
-                    break
-            if "customer" in question_lower:
-                for col in col_names:
-                    if any(keyword in col.lower() for keyword in ['customer', 'client', 'account']):
-                        select_cols.append(col)
-                        break
-        elif "expire" in question_lower or "expir" in question_lower:
-            for col in col_names:
-                if any(keyword in col.lower() for keyword in ['expir', 'end', 'terminat']):
+        elif "average" in intents or "annual" in intents:
+            col = roles["annual"]
+            if col:
+                select_cols.append(col)
+            if "customer" in intents:
+                col = roles["customer"]
+                if col:
                     select_cols.append(col)
-                    break
+        elif "expir" in intents:
+            col = roles["expiry"]
+            if col:
+                select_cols.append(col)
 
         if not select_cols:
             select_cols = ["*"]  # Fallback to all columns
 
-        # Build SQL with proper syntax for database type
-        if select_cols == ["*"]:
-            if is_sqlite:
-                sql_parts = [f"SELECT * FROM {main_table} LIMIT 100"]
-            else:
-                sql_parts = [f"SELECT TOP 100 * FROM {main_table}"]
-        else:
-            sql_parts = [f"SELECT {', '.join(select_cols)} FROM {main_table}"]
-            if is_sqlite:
-                sql_parts.append("LIMIT 100")
-            else:
-                # Insert TOP after SELECT
-                sql_parts[0] = f"SELECT TOP 100 {', '.join(select_cols)} FROM {main_table}"
-
         # Add WHERE clause for common keywords
         where_clauses = []
-        if "active" in question_lower:
-            status_cols = [col for col in col_names if 'status' in col.lower() or 'state' in col.lower()]
-            if status_cols:
-                status_col = status_cols[0]
+        if "active" in intents:
+            status_col = roles["status_or_state"]
+            if status_col:
                 where_clauses.append(f"{status_col} = 'Active'")
             else:
                 where_clauses.append("status = 'Active'")
-        
-        if "expir" in question_lower or "expire" in question_lower:
-            expir_cols = [col for col in col_names if 'expir' in col.lower() or 'end' in col.lower() or 'terminat' in col.lower()]
-            if expir_cols:
-                expir_col = expir_cols[0]
+
+        if "expir" in intents:
+            expir_col = roles["expiry"]
+            if expir_col:
                 if is_sqlite:
-                    if "quarter" in question_lower and "2025" in question_lower:
+                    if "quarter" in intents and "2025" in intents:
                         where_clauses.append(f"strftime('%Y', {expir_col}) = '2025'")
                     else:
                         where_clauses.append(f"{expir_col} IS NOT NULL")
                 else:
-                    if "quarter" in question_lower and "2025" in question_lower:
+                    if "quarter" in intents and "2025" in intents:
                         where_clauses.append(f"YEAR({expir_col}) = 2025")
                     else:
                         where_clauses.append(f"{expir_col} IS NOT NULL")
-        
-        if "compare" in question_lower or "vs" in question_lower:
-            # Group by status
-            status_cols = [col for col in col_names if 'status' in col.lower()]
-            if status_cols:
-                status_col = status_cols[0]
-                sql_parts.insert(-1 if is_sqlite else 1, f"GROUP BY {status_col}")
 
-        if where_clauses:
-            sql_parts.append(f"WHERE {' AND '.join(where_clauses)}")
+        group_by = None
+        if "compare" in intents or "vs" in intents:
+            # Group by status
+            group_by = roles["status"]
 
-        sql_query = " ".join(sql_parts)
+        # Render once, clauses in the order SQL requires; the row cap is
+        # TOP on SQL Server and LIMIT on SQLite
+        top = "" if is_sqlite else "TOP 100 "
+        where = f" WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+        group = f" GROUP BY {group_by}" if group_by else ""
+        limit = " LIMIT 100" if is_sqlite else ""
+        sql_query = f"SELECT {top}{', '.join(select_cols)} FROM {main_table}{where}{group}{limit}"
 
         return {
             "sql_query": sql_query,
@@ -423,12 +953,41 @@ Respond in JSON format:
         }
 
 
-@lru_cache()
+_MAPPER: Optional[SchemaMapper] = None
+_MAPPER_LOCK = threading.Lock()
+
+
+def init_schema_mapper() -> SchemaMapper:
+    """
+    Create the shared schema mapper and warm its caches
+
+    Called from application startup so the first request finds everything
+    built; safe to call concurrently or more than once.
+
+    Returns:
+        SchemaMapper instance
+    """
+    global _MAPPER
+    with _MAPPER_LOCK:
+        if _MAPPER is None:
+            mapper = SchemaMapper()
+            mapper.warm_caches()
+            _MAPPER = mapper
+    return _MAPPER
+
+
+def reset_schema_mapper() -> None:
+    """Drop the shared schema mapper (next use builds a fresh one)"""
+    global _MAPPER
+    with _MAPPER_LOCK:
+        _MAPPER = None
+
+
 def get_schema_mapper() -> SchemaMapper:
     """
-    Get cached schema mapper instance
+    Get shared schema mapper instance
 
     Returns:
         SchemaMapper instance
     """
-    return SchemaMapper()
+    return _MAPPER or init_schema_mapper()
@@ -10,7 +10,17 @@ Client mappings handle unavailable fields gracefully using type='unavailable'.
 
 Ontology Alignment: FIBO (Financial Industry Business Ontology)
 Coverage: Contract management, organizational hierarchy, compliance, governance
+
+CANONICAL_SCHEMA is read-only: the outer mapping and every entity are
+MappingProxyType views, so callers can hold references and cache anything
+derived from them without defensive copies. Use dict(...) for a mutable copy.
 """
+import hashlib
+import json
+import re
+from enum import IntEnum
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, Type, Union
 
 # Master canonical schema - comprehensive and stable for enterprise deployments
 CANONICAL_SCHEMA = {
@@ -514,3 +524,199 @@ CANONICAL_SCHEMA = {
         "created_date": "creation date (FIBO: fibo:hasCreationDate)"
     }
 }
+
+# Freeze: the schema is shared reference data and must not be mutated
+CANONICAL_SCHEMA = MappingProxyType({
+    entity: MappingProxyType(fields) for entity, fields in CANONICAL_SCHEMA.items()
+})
+
+
+# ====================
+# DERIVED LOOKUPS
+# ====================
+# Built on first access through the module __getattr__ hook (PEP 562), so
+# importing the schema costs nothing extra:
+#   SCHEMA_VERSION      short content hash; key caches of anything derived from the schema
+#   ENTITY_NAMES        entity vocabulary in declaration order; an entity's code is its index
+#   ENTITY_CODES        {entity: code}
+#   CANONICAL_FIELDS    {entity: frozenset of field names}, for membership checks
+#   FIELD_DESCRIPTIONS  {(entity, field): description}, one probe per lookup
+#   QUALIFIED_FIELDS    {"entity.field": (entity, field)}, for dotted references
+#   FIELD_ENUMS         {"entity.field": IntEnum} for fields whose description
+#                       lists a closed set of values ("status: draft, sent, paid")
+#   FIELD_SELECTIVITY_ORDER  {entity: field names, cheapest/most selective checks first}
+#   FIBO_PROPERTIES     sorted distinct FIBO tags from the descriptions
+#   FIELD_FIBO          {entity: {field: index into FIBO_PROPERTIES}}
+
+_FIBO_TAG_RE = re.compile(r"\(FIBO: (fibo:\w+)\)$")
+# A closed value list right before the FIBO tag; open lists ("..., etc.") don't match
+_ENUM_VALUES_RE = re.compile(r": ([a-z_]+(?:, [a-z_]+)+) \(FIBO:")
+
+
+def _fibo_tag(description: str) -> Optional[str]:
+    """Pull the trailing "(FIBO: fibo:hasX)" tag out of a description"""
+    match = _FIBO_TAG_RE.search(description)
+    return match.group(1) if match else None
+
+
+def _build_schema_version() -> str:
+    canonical = json.dumps(
+        {entity: dict(fields) for entity, fields in CANONICAL_SCHEMA.items()},
+        sort_keys=True
+    ).encode()
+    return hashlib.blake2b(canonical, digest_size=8).hexdigest()
+
+
+def _build_entity_names() -> Tuple[str, ...]:
+    return tuple(CANONICAL_SCHEMA)
+
+
+def _build_entity_codes() -> Dict[str, int]:
+    return {entity: code for code, entity in enumerate(_derived("ENTITY_NAMES"))}
+
+
+def _build_canonical_fields() -> Dict[str, FrozenSet[str]]:
+    return {entity: frozenset(fields) for entity, fields in CANONICAL_SCHEMA.items()}
+
+
+def _build_field_descriptions() -> Dict[Tuple[str, str], str]:
+    return {
+        (entity, field): description
+        for entity, fields in CANONICAL_SCHEMA.items()
+        for field, description in fields.items()
+    }
+
+
+def _build_qualified_fields() -> Dict[str, Tuple[str, str]]:
+    return {
+        f"{entity}.{field}": (entity, field)
+        for entity, field in _derived("FIELD_DESCRIPTIONS")
+    }
+
+
+def _build_field_enums() -> Dict[str, Type[IntEnum]]:
+    enums = {}
+    for (entity, field), description in _derived("FIELD_DESCRIPTIONS").items():
+        match = _ENUM_VALUES_RE.search(description)
+        if match:
+            name = "".join(part.capitalize() for part in f"{entity}_{field}".split("_"))
+            members = [value.upper() for value in match.group(1).split(", ")]
+            enums[f"{entity}.{field}"] = IntEnum(name, members, module=__name__)
+    return enums
+
+
+_NUMERIC_NAME_RE = re.compile(
+    r"(value|amount|price|cost|total|pct|percent|rate|count|quantity|days|score|hours)$"
+)
+_FREE_TEXT_FIELDS = frozenset({"description", "notes", "comments", "details", "summary"})
+
+
+def _selectivity_rank(entity: str, field: str, enums: Dict[str, Type[IntEnum]]) -> int:
+    """Rank a field by how cheap and selective a check on it is (lower runs first)"""
+    if f"{entity}.{field}" in enums:
+        return 0  # closed value set
+    if field == "id" or field.endswith("_id"):
+        return 1
+    if _NUMERIC_NAME_RE.search(field):
+        return 2
+    if field.endswith("_date"):
+        return 3
+    if field in _FREE_TEXT_FIELDS:
+        return 5
+    return 4
+
+
+def _build_field_selectivity_order() -> Dict[str, Tuple[str, ...]]:
+    enums = _derived("FIELD_ENUMS")
+    return {
+        entity: tuple(sorted(fields, key=lambda field: _selectivity_rank(entity, field, enums)))
+        for entity, fields in CANONICAL_SCHEMA.items()
+    }
+
+
+def _build_fibo_properties() -> Tuple[str, ...]:
+    tags = {_fibo_tag(description) for description in _derived("FIELD_DESCRIPTIONS").values()}
+    return tuple(sorted(tags - {None}))
+
+
+def _build_field_fibo() -> Dict[str, Dict[str, int]]:
+    index = {prop: i for i, prop in enumerate(_derived("FIBO_PROPERTIES"))}
+    return {
+        entity: {
+            field: index[tag]
+            for field, tag in ((field, _fibo_tag(description)) for field, description in fields.items())
+            if tag
+        }
+        for entity, fields in CANONICAL_SCHEMA.items()
+    }
+
+
+_BUILDERS: Dict[str, Callable[[], Any]] = {
+    "SCHEMA_VERSION": _build_schema_version,
+    "ENTITY_NAMES": _build_entity_names,
+    "ENTITY_CODES": _build_entity_codes,
+    "CANONICAL_FIELDS": _build_canonical_fields,
+    "FIELD_DESCRIPTIONS": _build_field_descriptions,
+    "QUALIFIED_FIELDS": _build_qualified_fields,
+    "FIELD_ENUMS": _build_field_enums,
+    "FIELD_SELECTIVITY_ORDER": _build_field_selectivity_order,
+    "FIBO_PROPERTIES": _build_fibo_properties,
+    "FIELD_FIBO": _build_field_fibo,
+}
+
+
+def _derived(name: str) -> Any:
+    """Get a derived table, building it and caching it as a module global on first use"""
+    value = globals().get(name)
+    if value is None:
+        value = globals()[name] = _BUILDERS[name]()
+    return value
+
+
+def __getattr__(name: str) -> Any:
+    if name in _BUILDERS:
+        return _derived(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def encode_entity(entity: Union[str, int]) -> int:
+    """
+    Get the small-int code for an entity, so references can be stored as one byte
+
+    Accepts a code as well, so APIs can take either form and convert once.
+    Raises KeyError for an unknown entity.
+    """
+    if isinstance(entity, bool):
+        raise KeyError(entity)  # bool is an int subclass, but never a code
+    if isinstance(entity, int):
+        if not 0 <= entity < len(_derived("ENTITY_NAMES")):
+            raise KeyError(entity)
+        return entity
+    return _derived("ENTITY_CODES")[entity]
+
+
+def decode_entity(code: int) -> str:
+    """Get the entity name for a code from encode_entity()"""
+    return _derived("ENTITY_NAMES")[code]
+
+
+def is_canonical_field(entity: str, field: str) -> bool:
+    """Check whether a field name belongs to a canonical entity"""
+    fields = _derived("CANONICAL_FIELDS").get(entity)
+    return fields is not None and field in fields
+
+
+def describe(entity: str, field: str) -> Optional[str]:
+    """Get the description of a canonical field, or None if it isn't defined"""
+    return _derived("FIELD_DESCRIPTIONS").get((entity, field))
+
+
+def resolve_field(qualified_name: str) -> Optional[Tuple[str, str]]:
+    """Split an "entity.field" reference, or return None if it isn't a canonical field"""
+    return _derived("QUALIFIED_FIELDS").get(qualified_name)
+
+
+def fibo_property(entity: str, field: str) -> Optional[str]:
+    """Get the FIBO property a canonical field maps to (e.g. "fibo:hasIdentifier")"""
+    index = _derived("FIELD_FIBO").get(entity, {}).get(field)
+    return None if index is None else _derived("FIBO_PROPERTIES")[index]
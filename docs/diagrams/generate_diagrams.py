@@ -2,40 +2,126 @@
 Generate SVG diagrams from Mermaid code
 Uses mermaid.ink API to convert Mermaid to SVG
 """
+import asyncio
 import base64
-import urllib.request
-import urllib.parse
+from functools import lru_cache
+import hashlib
+import os
+import tempfile
 from pathlib import Path
+from typing import Optional
 import zlib
 
+import httpx
 
-def mermaid_to_svg(mermaid_code: str) -> str:
+# Diagrams are fetched over the network, so overlap the requests
+MAX_CONNECTIONS = 8
+
+# Rendered SVGs by content hash, so unchanged sources never hit the network
+CACHE_DIR = Path.home() / ".cache" / "mermaid_svg"
+
+
+async def mermaid_to_svg(client: httpx.AsyncClient, mermaid_code: str) -> Optional[bytes]:
     """
     Convert Mermaid code to SVG using mermaid.ink API
 
     Args:
+        client: Shared HTTP client (pooled keep-alive connections)
         mermaid_code: Mermaid diagram code
 
     Returns:
-        SVG content as string
+        SVG content as raw bytes, exactly as served, or None if the fetch failed
     """
-    # Encode mermaid code
-    encoded = base64.urlsafe_b64encode(
-        zlib.compress(mermaid_code.encode('utf-8'), 9)
-    ).decode('ascii')
+    # Serve from the local cache if this exact source was rendered before
+    cache_file = CACHE_DIR / f"{hashlib.sha256(mermaid_code.encode('utf-8')).hexdigest()}.svg"
+    if cache_file.exists():
+        return cache_file.read_bytes()
 
     # Generate URL
-    url = f"https://mermaid.ink/svg/{encoded}"
+    url = f"https://mermaid.ink/svg/{_encode(mermaid_code)}"
 
     # Fetch SVG
     try:
-        with urllib.request.urlopen(url, timeout=30) as response:
-            svg_content = response.read().decode('utf-8')
-        return svg_content
+        response = await client.get(url)
+        response.raise_for_status()
+        svg_content = response.content
     except Exception as e:
         print(f"Error fetching SVG: {e}")
         return None
 
+    _write_cache(cache_file, svg_content)
+    return svg_content
+
+
+@lru_cache(maxsize=512)
+def _encode(mermaid_code: str) -> str:
+    """Compress and base64 a Mermaid source for the mermaid.ink URL path"""
+    # Fastest zlib level; level 9 barely shrinks short sources
+    return base64.urlsafe_b64encode(
+        zlib.compress(mermaid_code.encode('utf-8'), 1)
+    ).decode('ascii')
+
+
+def _write_cache(cache_file: Path, svg_content: bytes) -> None:
+    """Store a rendered SVG atomically (write a temp file, then rename)"""
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            'wb', dir=CACHE_DIR, suffix='.tmp', delete=False
+        ) as tmp:
+            tmp.write(svg_content)
+        os.replace(tmp.name, cache_file)
+    except OSError as e:
+        print(f"Warning: could not cache SVG: {e}")
+
+
+async def generate_diagram(client: httpx.AsyncClient, mmd_file: Path) -> bool:
+    """
+    Convert one .mmd file to an .svg file next to it
+
+    Args:
+        client: Shared HTTP client
+        mmd_file: Path to the Mermaid source
+
+    Returns:
+        True if the SVG was written
+    """
+    # Read Mermaid code
+    mermaid_code = mmd_file.read_text(encoding='utf-8')
+
+    # Generate SVG
+    svg_content = await mermaid_to_svg(client, mermaid_code)
+    if not svg_content:
+        return False
+
+    # Save SVG (bytes straight from the response, no decode/encode round trip)
+    mmd_file.with_suffix('.svg').write_bytes(svg_content)
+    return True
+
+
+async def _generate_files(mmd_files: list):
+    """Fetch all given diagrams concurrently over one pooled client"""
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        retries=3  # Connection failures only
+    )
+    async with httpx.AsyncClient(transport=transport, timeout=30.0) as client:
+
+        async def run(mmd_file: Path):
+            try:
+                return mmd_file, await generate_diagram(client, mmd_file)
+            except Exception as e:
+                # One bad diagram must not stop the others
+                print(f"Error processing {mmd_file.name}: {e}")
+                return mmd_file, False
+
+        for next_done in asyncio.as_completed([run(mmd_file) for mmd_file in mmd_files]):
+            mmd_file, generated = await next_done
+            if generated:
+                print(f"✅ Generated: {mmd_file.with_suffix('.svg').name}")
+            else:
+                print(f"❌ Failed to generate SVG for {mmd_file.name}")
+
 
 def generate_all_diagrams():
     """Generate SVG files for all Mermaid diagrams"""
@@ -48,25 +134,18 @@ def generate_all_diagrams():
 
     print(f"Found {len(mermaid_files)} Mermaid diagram(s)")
 
+    # Skip diagrams whose SVG is already newer than the source
+    stale_files = []
     for mmd_file in mermaid_files:
-        print(f"\nProcessing: {mmd_file.name}")
-
-        # Read Mermaid code
-        with open(mmd_file, 'r') as f:
-            mermaid_code = f.read()
-
-        # Generate SVG
-        svg_content = mermaid_to_svg(mermaid_code)
-
-        if svg_content:
-            # Save SVG
-            svg_file = mmd_file.with_suffix('.svg')
-            with open(svg_file, 'w') as f:
-                f.write(svg_content)
-
-            print(f"✅ Generated: {svg_file.name}")
+        svg_file = mmd_file.with_suffix('.svg')
+        if svg_file.exists() and svg_file.stat().st_mtime >= mmd_file.stat().st_mtime:
+            print(f"⏭️  Up to date: {svg_file.name}")
         else:
-            print(f"❌ Failed to generate SVG for {mmd_file.name}")
+            stale_files.append(mmd_file)
+
+    # Fetch concurrently; the connection pool caps requests in flight
+    if stale_files:
+        asyncio.run(_generate_files(stale_files))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Tests for the canonical schema module and its derived lookup tables
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCHEMA_PATH = Path(__file__).parent.parent / "data" / "canonical_schema" / "active" / "canonical_schema.py"
+
+
+def _load_schema_module():
+    """Import the canonical schema file (the data directory isn't a package)"""
+    spec = importlib.util.spec_from_file_location("canonical_schema", SCHEMA_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def schema():
+    """Canonical schema module shared by the tests in this file"""
+    return _load_schema_module()
+
+
+class TestCanonicalSchema:
+    """Test the read-only canonical schema"""
+
+    def test_schema_is_read_only(self, schema):
+        """Test entities and fields can't be modified in place"""
+        with pytest.raises(TypeError):
+            schema.CANONICAL_SCHEMA["invoice"] = {}
+        with pytest.raises(TypeError):
+            schema.CANONICAL_SCHEMA["contract"]["id"] = "changed"
+
+    def test_tables_built_lazily(self):
+        """Test derived tables only exist once they are accessed"""
+        module = _load_schema_module()
+
+        assert "FIELD_ENUMS" not in vars(module)
+        enums = module.FIELD_ENUMS
+        assert vars(module)["FIELD_ENUMS"] is enums
+
+    def test_schema_version(self, schema):
+        """Test the schema version is a short, stable content hash"""
+        assert len(schema.SCHEMA_VERSION) == 16
+        assert int(schema.SCHEMA_VERSION, 16) >= 0
+        assert _load_schema_module().SCHEMA_VERSION == schema.SCHEMA_VERSION
+
+
+class TestEntityCodes:
+    """Test entity name <-> code conversion"""
+
+    def test_round_trip(self, schema):
+        """Test every entity encodes to its index and decodes back"""
+        for code, entity in enumerate(schema.CANONICAL_SCHEMA):
+            assert schema.encode_entity(entity) == code
+            assert schema.encode_entity(code) == code
+            assert schema.decode_entity(code) == entity
+
+    @pytest.mark.parametrize("entity", ["spaceship", -1, 10_000, True, False])
+    def test_invalid_entity(self, schema, entity):
+        """Test unknown names, out-of-range codes and bools are rejected"""
+        with pytest.raises(KeyError):
+            schema.encode_entity(entity)
+
+
+class TestFieldLookups:
+    """Test field membership, description and FIBO lookups"""
+
+    def test_canonical_fields(self, schema):
+        """Test field sets match the schema"""
+        for entity, fields in schema.CANONICAL_SCHEMA.items():
+            assert schema.CANONICAL_FIELDS[entity] == frozenset(fields)
+
+        assert schema.is_canonical_field("contract", "id")
+        assert not schema.is_canonical_field("contract", "unknown_field")
+        assert not schema.is_canonical_field("spaceship", "id")
+
+    def test_describe_and_resolve(self, schema):
+        """Test description and dotted-name lookups"""
+        assert schema.describe("contract", "id") == schema.CANONICAL_SCHEMA["contract"]["id"]
+        assert schema.describe("contract", "unknown_field") is None
+        assert schema.resolve_field("contract.id") == ("contract", "id")
+        assert schema.resolve_field("contract.unknown_field") is None
+
+    def test_fibo_property(self, schema):
+        """Test every field's FIBO property matches the tag in its description"""
+        for entity, fields in schema.CANONICAL_SCHEMA.items():
+            for field, description in fields.items():
+                prop = schema.fibo_property(entity, field)
+                if prop is None:
+                    assert "(FIBO:" not in description
+                else:
+                    assert description.endswith(f"(FIBO: {prop})")
+
+        assert schema.fibo_property("contract", "id") == "fibo:hasIdentifier"
+        assert list(schema.FIBO_PROPERTIES) == sorted(set(schema.FIBO_PROPERTIES))
+
+
+class TestFieldEnums:
+    """Test value enums parsed from field descriptions"""
+
+    def test_closed_value_list(self, schema):
+        """Test a description's value list becomes an IntEnum"""
+        risk_level = schema.FIELD_ENUMS["contract.risk_level"]
+
+        assert list(risk_level.__members__) == ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+        assert risk_level.LOW < risk_level.CRITICAL
+
+    def test_members_come_from_description(self, schema):
+        """Test every enum member is named in its field's description"""
+        for qualified_name, enum in schema.FIELD_ENUMS.items():
+            entity, field = schema.resolve_field(qualified_name)
+            description = schema.describe(entity, field)
+            for member in enum.__members__:
+                assert member.lower() in description
+
+
+class TestSelectivityOrder:
+    """Test per-entity field ordering for filter checks"""
+
+    def test_order_is_permutation_of_fields(self, schema):
+        """Test each entity's order lists every field exactly once"""
+        for entity, fields in schema.CANONICAL_SCHEMA.items():
+            order = schema.FIELD_SELECTIVITY_ORDER[entity]
+            assert sorted(order) == sorted(fields)
+
+    def test_enum_fields_first_free_text_last(self, schema):
+        """Test closed-value fields run first and free text last"""
+        order = schema.FIELD_SELECTIVITY_ORDER["contract"]
+
+        assert order[0] == "risk_level"
+        assert order[-1] == "notes"
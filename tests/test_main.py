@@ -4,9 +4,11 @@ Tests updated to work with new modular architecture
 """
 
 import pytest
+import asyncio
 import json
+import time
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch, AsyncMock
 import sys
 import os
 
@@ -15,17 +17,109 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.main import app
 from app.models.schemas import SchemaRepository
-from app.services import SchemaMapper, QueryExecutor, LLMService
+from app.services import LLMService
 from app.api.dependencies import get_mapper, get_executor, get_llm
 
-# Create test client (positional argument, not keyword)
-client = TestClient(app)
+@pytest.fixture(scope="session")
+def client():
+    """Test client shared by the whole run (positional argument, not keyword)"""
+    return TestClient(app)
+
+
+class _StubMapper:
+    """Stand-in for SchemaMapper exposing only what the query route calls"""
+
+    def __init__(self):
+        self.get_mapping = AsyncMock()
+
+
+class _StubExecutor:
+    """Stand-in for QueryExecutor exposing only what the query route calls"""
+
+    def __init__(self):
+        self.execute_query = AsyncMock()
+
+
+@pytest.fixture
+def mock_mapper():
+    """Schema mapper stub installed as the get_mapper dependency"""
+    mapper = _StubMapper()
+    app.dependency_overrides[get_mapper] = lambda: mapper
+    yield mapper
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def mock_executor():
+    """Query executor stub installed as the get_executor dependency"""
+    executor = _StubExecutor()
+    app.dependency_overrides[get_executor] = lambda: executor
+    yield executor
+    app.dependency_overrides.clear()
+
+
+def _prompt_questions(prompt):
+    """Questions asked by a single or batched mapping prompt, in order"""
+    if "User Questions:\n" in prompt:
+        block = prompt.split("User Questions:\n", 1)[1].split("\n\n", 1)[0]
+        return [line.split(". ", 1)[1] for line in block.splitlines()]
+    return [prompt.split("User Question: ", 1)[1].split("\n", 1)[0]]
+
+
+def _ai_mapping(question):
+    """Canned LLM mapping, tagged with the question it answers"""
+    return {"sql_query": "SELECT 1", "mappings": {}, "explanation": f"AI: {question}"}
+
+
+def _mapping_reply(prompt):
+    """Well-formed LLM reply for a single or batched mapping prompt"""
+    mappings = [_ai_mapping(q) for q in _prompt_questions(prompt)]
+    if "User Questions:\n" in prompt:
+        return json.dumps(mappings)
+    return json.dumps(mappings[0])
+
+
+class _FakeLLM:
+    """LLMService stand-in that answers prompts with a reply function"""
+
+    parse_json_response = LLMService.parse_json_response
+
+    def __init__(self, reply=_mapping_reply, delay=0.01):
+        self.reply = reply
+        self.delay = delay
+        self.prompts = []
+        self.timeouts = []
+        self.max_tokens = []
+
+    async def generate_completion(self, messages, temperature=None, max_tokens=None, timeout=None):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        self.timeouts.append(timeout)
+        self.max_tokens.append(max_tokens)
+        await asyncio.sleep(self.delay)
+        return self.reply(prompt)
+
+
+@pytest.fixture
+def make_mapper():
+    """Build SchemaMappers backed by a fake LLM, with settings overrides"""
+    from app.core.config import get_settings
+    from app.services import schema_mapper
+
+    def make(llm, **settings):
+        mapper = schema_mapper.SchemaMapper(llm_service=llm)
+        mapper.settings = get_settings().model_copy(update=settings)
+        return mapper
+
+    schema_mapper._llm_cache.clear()
+    yield make
+    schema_mapper._llm_cache.clear()
 
 
 class TestAPIEndpoints:
     """Test API endpoints"""
 
-    def test_root_endpoint(self):
+    def test_root_endpoint(self, client):
         """Test the root endpoint returns API information"""
         response = client.get("/")
         assert response.status_code == 200
@@ -34,7 +128,7 @@ class TestAPIEndpoints:
         assert "Multi-Tenant Schema Translator API" in data["message"]
         assert "endpoints" in data
 
-    def test_get_customers(self):
+    def test_get_customers(self, client):
         """Test retrieving list of customer schemas"""
         response = client.get("/customers")
         assert response.status_code == 200
@@ -51,7 +145,7 @@ class TestAPIEndpoints:
         assert customer_a["database"] == "customer_a_db"
         assert "contracts" in customer_a["tables"]
 
-    def test_get_specific_schema(self):
+    def test_get_specific_schema(self, client):
         """Test retrieving a specific customer's schema"""
         response = client.get("/schema/customer_a")
         assert response.status_code == 200
@@ -61,7 +155,23 @@ class TestAPIEndpoints:
         assert "contracts" in data["schema"]
         assert "canonical_mapping_hint" in data
 
-    def test_invalid_customer_schema(self):
+    def test_restart_builds_fresh_services(self):
+        """Test services closed at shutdown aren't reused after a restart"""
+        from app.services import get_llm_service, get_schema_mapper
+
+        with TestClient(app):
+            llm = get_llm_service()
+            mapper = get_schema_mapper()
+
+        assert llm.client.is_closed()
+
+        with TestClient(app):
+            assert get_llm_service() is not llm
+            assert get_schema_mapper() is not mapper
+            assert get_schema_mapper().llm_service is get_llm_service()
+            assert not get_llm_service().client.is_closed()
+
+    def test_invalid_customer_schema(self, client):
         """Test error handling for invalid customer"""
         response = client.get("/schema/invalid_customer")
         assert response.status_code == 404
@@ -71,20 +181,15 @@ class TestAPIEndpoints:
 class TestQueryEndpoint:
     """Test query endpoint with dependency injection"""
 
-    def test_query_with_mocked_services(self):
+    def test_query_with_mocked_services(self, client, mock_mapper, mock_executor):
         """Test query endpoint with mocked services"""
 
-        # Create mock mapper
-        mock_mapper = MagicMock(spec=SchemaMapper)
-        mock_mapper.get_mapping = AsyncMock(return_value={
+        mock_mapper.get_mapping.return_value = {
             "sql_query": "SELECT * FROM contracts WHERE status = 'Active'",
             "mappings": {"status": "status"},
             "calculations": {},
             "explanation": "Querying active contracts"
-        })
-
-        # Create mock executor
-        mock_executor = MagicMock(spec=QueryExecutor)
+        }
         mock_executor.execute_query.return_value = [
             {
                 "contract_id": 1,
@@ -93,62 +198,52 @@ class TestQueryEndpoint:
             }
         ]
 
-        # Override dependencies
-        app.dependency_overrides[get_mapper] = lambda: mock_mapper
-        app.dependency_overrides[get_executor] = lambda: mock_executor
-
-        try:
-            # Make request
-            response = client.post("/query", json={
-                "question": "Show me all active contracts",
-                "customer_id": "customer_a"
-            })
-
-            assert response.status_code == 200
-            data = response.json()
-            assert "answer" in data
-            assert "customer_schemas_used" in data
-            assert "customer_a" in data["customer_schemas_used"]
-
-        finally:
-            # Clean up overrides
-            app.dependency_overrides.clear()
-
-    def test_query_all_customers(self):
-        """Test querying across all customers"""
-
-        # Create mock mapper
-        mock_mapper = MagicMock(spec=SchemaMapper)
-        mock_mapper.get_mapping = AsyncMock(return_value={
-            "sql_query": "SELECT * FROM contracts",
-            "mappings": {},
-            "calculations": {},
-            "explanation": "Querying all contracts"
+        # Make request
+        response = client.post("/query", json={
+            "question": "Show me all active contracts",
+            "customer_id": "customer_a"
         })
 
-        # Create mock executor
-        mock_executor = MagicMock(spec=QueryExecutor)
+        assert response.status_code == 200
+        data = response.json()
+        assert "answer" in data
+        assert "customer_schemas_used" in data
+        assert "customer_a" in data["customer_schemas_used"]
+
+    def test_query_all_customers(self, client, mock_mapper, mock_executor):
+        """Test querying across all customers (mapped concurrently)"""
+        spans = []
+
+        async def get_mapping(*args, **kwargs):
+            # Record when each call is in flight; serial awaits would not overlap
+            start = time.perf_counter_ns()
+            await asyncio.sleep(0.05)
+            spans.append((start, time.perf_counter_ns()))
+            return {
+                "sql_query": "SELECT * FROM contracts",
+                "mappings": {},
+                "calculations": {},
+                "explanation": "Querying all contracts"
+            }
+
+        mock_mapper.get_mapping.side_effect = get_mapping
         mock_executor.execute_query.return_value = [
             {"contract_id": 1, "contract_name": "Test"}
         ]
 
-        # Override dependencies
-        app.dependency_overrides[get_mapper] = lambda: mock_mapper
-        app.dependency_overrides[get_executor] = lambda: mock_executor
-
-        try:
-            response = client.post("/query", json={
-                "question": "Show me all contracts",
-                "customer_id": None
-            })
+        response = client.post("/query", json={
+            "question": "Show me all contracts",
+            "customer_id": None
+        })
 
-            assert response.status_code == 200
-            data = response.json()
-            # Should query all 4 customers
-            assert len(data["customer_schemas_used"]) == 4
+        assert response.status_code == 200
+        # Every customer's mapping ran at the same time as every other
+        assert len(spans) == 4
+        assert max(start for start, _ in spans) < min(end for _, end in spans)
 
-        finally:
-            app.dependency_overrides.clear()
+        data = response.json()
+        # Should query all 4 customers
+        assert len(data["customer_schemas_used"]) == 4
 
 
 class TestSchemaRepository:
@@ -176,6 +271,18 @@ class TestSchemaRepository:
         assert "id" in canonical["contract"]
         assert "total_value" in canonical["contract"]
 
+    def test_canonical_membership(self):
+        """Test canonical entity and field membership checks"""
+        from app.models.schemas import get_schema_repository
+
+        repo = get_schema_repository()
+
+        assert repo.has_canonical_entity("contract")
+        assert not repo.has_canonical_entity("shipment")
+        assert repo.has_canonical_field("contract", "total_value")
+        assert not repo.has_canonical_field("contract", "unknown_field")
+        assert not repo.has_canonical_field("shipment", "id")
+
     def test_list_customers(self):
         """Test listing all customers"""
         from app.models.schemas import get_schema_repository
@@ -200,6 +307,288 @@ class TestSchemaRepository:
         assert "invalid_customer" in str(exc_info.value)
 
 
+class TestSchemaMapper:
+    """Test LLM mapping cache, request coalescing and batching"""
+
+    def test_identical_misses_share_one_call(self, make_mapper):
+        """Test concurrent identical questions make a single LLM call"""
+        llm = _FakeLLM()
+        mapper = make_mapper(llm)
+
+        async def run():
+            return await asyncio.gather(*(
+                mapper.get_mapping("client_a", "Show active contracts") for _ in range(5)
+            ))
+
+        results = asyncio.run(run())
+
+        assert len(llm.prompts) == 1
+        assert all(r["explanation"] == "AI: Show active contracts" for r in results)
+
+    def test_joined_request_survives_leader_cancellation(self, make_mapper):
+        """Test a caller sharing an in-flight call still gets the mapping"""
+        llm = _FakeLLM()
+        mapper = make_mapper(llm)
+
+        async def run():
+            leader = asyncio.create_task(mapper.get_mapping("client_a", "Show all contracts"))
+            await asyncio.sleep(0)  # Leader's LLM call is now in flight
+            joiner = asyncio.create_task(mapper.get_mapping("client_a", "Show all contracts"))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return leader, await joiner
+
+        leader, result = asyncio.run(run())
+
+        assert leader.cancelled()
+        assert result["explanation"] == "AI: Show all contracts"
+        assert len(llm.prompts) == 1
+
+    def test_null_calculations_accepted(self, make_mapper):
+        """Test a reply with "calculations": null is kept, not sent to the fallback"""
+        def reply(prompt):
+            mapping = _ai_mapping(_prompt_questions(prompt)[0])
+            mapping["calculations"] = None
+            return json.dumps(mapping)
+
+        mapper = make_mapper(_FakeLLM(reply=reply), LLM_BATCH_MAX_QUESTIONS=1)
+
+        result = asyncio.run(mapper.get_mapping("client_a", "Show all contracts"))
+
+        assert result["explanation"] == "AI: Show all contracts"
+        assert result["calculations"] == {}
+
+    def test_cached_mapping_unaffected_by_caller_changes(self, make_mapper):
+        """Test mutating a returned mapping doesn't change later cache hits"""
+        def reply(prompt):
+            mapping = _ai_mapping(_prompt_questions(prompt)[0])
+            mapping["mappings"] = {"total_value": "contract_value"}
+            mapping["calculations"] = {"total_value": "as stored"}
+            return json.dumps(mapping)
+
+        llm = _FakeLLM(reply=reply)
+        mapper = make_mapper(llm, LLM_BATCH_MAX_QUESTIONS=1)
+
+        first = asyncio.run(mapper.get_mapping("client_a", "Total contract value"))
+        first["mappings"]["total_value"] = "changed"
+        first["calculations"].clear()
+        first["sql_query"] = "changed"
+
+        second = asyncio.run(mapper.get_mapping("client_a", "Total contract value"))
+
+        assert len(llm.prompts) == 1
+        assert second["mappings"] == {"total_value": "contract_value"}
+        assert second["calculations"] == {"total_value": "as stored"}
+        assert second["sql_query"] == "SELECT 1"
+
+    def test_cache_stats_logging_disabled(self, make_mapper):
+        """Test a stats log interval of 0 turns logging off instead of failing"""
+        mapper = make_mapper(_FakeLLM(), LLM_CACHE_STATS_LOG_INTERVAL=0)
+
+        result = asyncio.run(mapper.get_mapping("client_a", "Show all contracts"))
+
+        assert result["explanation"] == "AI: Show all contracts"
+
+    def test_cache_evicts_least_recently_used(self, make_mapper):
+        """Test the LLM cache keeps at most LLM_CACHE_MAX_ENTRIES mappings"""
+        llm = _FakeLLM()
+        mapper = make_mapper(llm, LLM_CACHE_MAX_ENTRIES=2, LLM_BATCH_MAX_QUESTIONS=1)
+
+        async def ask(*questions):
+            for question in questions:
+                await mapper.get_mapping("client_a", question)
+
+        # "first" is used again before "third" arrives, so "second" is evicted
+        asyncio.run(ask("first", "second", "first", "third"))
+        assert len(llm.prompts) == 3
+
+        asyncio.run(ask("first", "third"))
+        assert len(llm.prompts) == 3
+
+        asyncio.run(ask("second"))
+        assert _prompt_questions(llm.prompts[-1]) == ["second"]
+        assert len(llm.prompts) == 4
+
+    def test_concurrent_misses_are_batched(self, make_mapper):
+        """Test distinct concurrent questions share one batched LLM call"""
+        llm = _FakeLLM()
+        mapper = make_mapper(llm)
+        questions = [f"Show contracts in region {i}" for i in range(4)]
+
+        async def run():
+            return await asyncio.gather(*(
+                mapper.get_mapping("client_a", q) for q in questions
+            ))
+
+        results = asyncio.run(run())
+
+        assert len(llm.prompts) == 1
+        assert _prompt_questions(llm.prompts[0]) == questions
+        assert [r["explanation"] for r in results] == [f"AI: {q}" for q in questions]
+
+    def test_wrong_length_batch_falls_back(self, make_mapper):
+        """Test a batch reply with the wrong number of mappings fails every caller"""
+        llm = _FakeLLM(reply=lambda prompt: json.dumps([_ai_mapping("only one")]))
+        mapper = make_mapper(llm)
+
+        async def run():
+            return await asyncio.gather(*(
+                mapper.get_mapping("client_a", f"Show contract {i}") for i in range(3)
+            ))
+
+        results = asyncio.run(run())
+
+        assert len(llm.prompts) == 1
+        assert all(r["explanation"].startswith("Rule-based fallback") for r in results)
+
+    def test_invalid_batch_element_falls_back_alone(self, make_mapper):
+        """Test one malformed mapping in a batch only affects its own caller"""
+        def reply(prompt):
+            mappings = [_ai_mapping(q) for q in _prompt_questions(prompt)]
+            del mappings[1]["sql_query"]
+            return json.dumps(mappings)
+
+        llm = _FakeLLM(reply=reply)
+        mapper = make_mapper(llm)
+        questions = [f"Show contract {i}" for i in range(3)]
+
+        async def run():
+            return await asyncio.gather(*(
+                mapper.get_mapping("client_a", q) for q in questions
+            ))
+
+        results = asyncio.run(run())
+
+        assert len(llm.prompts) == 1
+        assert results[0]["explanation"] == f"AI: {questions[0]}"
+        assert results[1]["explanation"].startswith("Rule-based fallback")
+        assert results[2]["explanation"] == f"AI: {questions[2]}"
+
+    def test_cancelled_batch_caller_is_skipped(self, make_mapper):
+        """Test a caller cancelled while queued doesn't break the batch"""
+        llm = _FakeLLM()
+        mapper = make_mapper(llm)
+        customer_schema = mapper.schema_repo.get_schema("client_a")
+        canonical_schema = mapper.schema_repo.get_canonical_schema()
+
+        async def run():
+            tasks = [
+                asyncio.create_task(mapper._request_ai_mapping(
+                    "client_a", f"Show contract {i}", customer_schema, canonical_schema
+                ))
+                for i in range(3)
+            ]
+            await asyncio.sleep(0)  # All three queued in the pending batch
+            tasks[1].cancel()
+            # Bounded, so a batch that never resolves its callers fails the test
+            return await asyncio.wait_for(
+                asyncio.gather(*tasks, return_exceptions=True), timeout=1
+            )
+
+        first, second, third = asyncio.run(run())
+
+        assert len(llm.prompts) == 1
+        assert isinstance(second, asyncio.CancelledError)
+        assert first["explanation"] == "AI: Show contract 0"
+        assert third["explanation"] == "AI: Show contract 2"
+
+    def test_batched_call_gets_scaled_request_timeout(self, make_mapper):
+        """Test a batch's per-attempt timeout reaches the LLM request itself"""
+        llm = _FakeLLM()
+        mapper = make_mapper(llm, LLM_ATTEMPT_TIMEOUT_SECONDS=2.0)
+
+        async def run():
+            return await asyncio.gather(*(
+                mapper.get_mapping("client_a", f"Show contract {i}") for i in range(3)
+            ))
+
+        asyncio.run(run())
+
+        assert llm.timeouts == [6.0]
+
+    def test_batches_capped_by_token_and_timeout_ceilings(self, make_mapper):
+        """Test bursts split to fit LLM_BATCH_MAX_TOKENS and timeouts are capped"""
+        llm = _FakeLLM()
+        mapper = make_mapper(
+            llm,
+            LLM_MAX_TOKENS=1000,
+            LLM_BATCH_MAX_TOKENS=2500,
+            LLM_ATTEMPT_TIMEOUT_SECONDS=2.0,
+            LLM_BATCH_MAX_TIMEOUT_SECONDS=3.0
+        )
+        questions = [f"Show contract {i}" for i in range(5)]
+
+        async def run():
+            return await asyncio.gather(*(
+                mapper.get_mapping("client_a", q) for q in questions
+            ))
+
+        results = asyncio.run(run())
+
+        assert [len(_prompt_questions(p)) for p in llm.prompts] == [2, 2, 1]
+        assert llm.max_tokens == [2000, 2000, None]
+        assert llm.timeouts == [3.0, 3.0, 2.0]
+        assert [r["explanation"] for r in results] == [f"AI: {q}" for q in questions]
+
+    def test_timed_out_calls_retry_then_fall_back(self, make_mapper):
+        """Test stalled LLM calls are retried and then fall back to rules"""
+        llm = _FakeLLM(delay=1.0)
+        mapper = make_mapper(
+            llm,
+            LLM_BATCH_MAX_QUESTIONS=1,
+            LLM_ATTEMPT_TIMEOUT_SECONDS=0.05,
+            LLM_TIMEOUT_RETRIES=1,
+            LLM_TIMEOUT_BACKOFF_SECONDS=0
+        )
+
+        result = asyncio.run(mapper.get_mapping("client_a", "Show all contracts"))
+
+        assert len(llm.prompts) == 2
+        assert llm.timeouts == [0.05, 0.05]
+        assert result["explanation"].startswith("Rule-based fallback")
+
+    def test_batch_size_one_disables_batching(self, make_mapper):
+        """Test LLM_BATCH_MAX_QUESTIONS=1 sends one prompt per question"""
+        llm = _FakeLLM()
+        mapper = make_mapper(llm, LLM_BATCH_MAX_QUESTIONS=1)
+
+        async def run():
+            return await asyncio.gather(*(
+                mapper.get_mapping("client_a", f"Show contract {i}") for i in range(3)
+            ))
+
+        results = asyncio.run(run())
+
+        assert len(llm.prompts) == 3
+        assert all("User Questions:" not in prompt for prompt in llm.prompts)
+        assert [r["explanation"] for r in results] == [f"AI: Show contract {i}" for i in range(3)]
+
+    def test_rule_based_sql_clause_order_sqlite(self, make_mapper):
+        """Test the SQLite fallback puts WHERE before GROUP BY and LIMIT"""
+        mapper = make_mapper(_FakeLLM())
+        schema = mapper.schema_repo.get_schema("client_a")
+
+        mapping = mapper._get_rule_based_mapping("client_a", "Compare active contracts", schema)
+
+        assert mapping["sql_query"] == (
+            "SELECT * FROM contracts WHERE status = 'Active' GROUP BY status LIMIT 100"
+        )
+
+    def test_rule_based_sql_clause_order_sqlserver(self, make_mapper):
+        """Test the SQL Server fallback caps rows with TOP, not LIMIT"""
+        mapper = make_mapper(_FakeLLM())
+        schema = {
+            "connection": {"type": "sqlserver", "server": "srv", "database": "db"},
+            "tables": {"contracts": {"columns": {"id": "INT", "status": "VARCHAR(20)"}}},
+        }
+
+        mapping = mapper._get_rule_based_mapping("sql_client", "Compare active contracts", schema)
+
+        assert mapping["sql_query"] == (
+            "SELECT TOP 100 * FROM contracts WHERE status = 'Active' GROUP BY status"
+        )
+
+
 class TestResponseFormatter:
     """Test response formatter"""
 
@@ -238,6 +627,44 @@ class TestResponseFormatter:
         assert "Using lifetime value" in response
         assert "Using annual value" in response
 
+    def test_format_mixed_row_layouts(self):
+        """Test rows from one client with different columns are all rendered"""
+        from app.services.response_formatter import ResponseFormatter
+
+        results = [
+            {"_client_id": "client_a", "contract_name": "Test Contract", "value": 100000},
+            {"_client_id": "client_a", "title": "Another Contract", "annual_value": 50000},
+        ]
+
+        response = ResponseFormatter.format_query_response("Show all contracts", results, {})
+
+        assert "contract_name: Test Contract, value: 100000" in response
+        assert "title: Another Contract, annual_value: 50000" in response
+
+        # Same columns in a different order keep the row's own order
+        results = [
+            {"_client_id": "client_a", "name": "First", "value": 1},
+            {"_client_id": "client_a", "value": 2, "name": "Second"},
+        ]
+
+        response = ResponseFormatter.format_query_response("Show all contracts", results, {})
+
+        assert "name: First, value: 1" in response
+        assert "value: 2, name: Second" in response
+
+        # Comparison table path (several clients, few rows each)
+        results = [
+            {"_client_id": "client_a", "status": "Active", "total": 3},
+            {"_client_id": "client_a", "status": "Expired", "count": 1},
+            {"_client_id": "client_b", "status": "Active", "total": 5},
+        ]
+
+        response = ResponseFormatter.format_query_response("Contracts by status", results, {})
+
+        assert "**Status: Expired**" in response
+        assert "Client A: count: 1" in response
+        assert "Client B: total: 5" in response
+
     def test_empty_results(self):
         """Test formatting when no results"""
         from app.services.response_formatter import ResponseFormatter
@@ -295,6 +722,46 @@ class TestMockData:
             assert isinstance(mock_data[0], dict)
 
 
+class TestSQLiteConnections:
+    """Test cached SQLite connections"""
+
+    @staticmethod
+    def _make_db(path, value):
+        import sqlite3
+
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE t (v INTEGER)")
+        conn.execute("INSERT INTO t VALUES (?)", (value,))
+        conn.commit()
+        conn.close()
+
+    def test_connection_reused_and_invalidated(self, tmp_path):
+        """Test connections are reused until the file is replaced or cleared"""
+        import sqlite3
+        from app.services.query_executor import QueryExecutor, _sqlite_local
+
+        db_path = tmp_path / "client.db"
+        self._make_db(db_path, 1)
+        run = QueryExecutor._execute_sqlite_sync
+
+        assert run(db_path, "SELECT v FROM t") == [{"v": 1}]
+        conn = _sqlite_local.connections[db_path][0]
+        assert run(db_path, "SELECT v FROM t") == [{"v": 1}]
+        assert _sqlite_local.connections[db_path][0] is conn
+
+        # Database rebuilt and swapped in on disk
+        self._make_db(tmp_path / "rebuilt.db", 2)
+        os.replace(tmp_path / "rebuilt.db", db_path)
+        assert run(db_path, "SELECT v FROM t") == [{"v": 2}]
+        conn = _sqlite_local.connections[db_path][0]
+
+        QueryExecutor().close_sqlite_connections()
+        assert run(db_path, "SELECT v FROM t") == [{"v": 2}]
+        assert _sqlite_local.connections[db_path][0] is not conn
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
 class TestConfiguration:
     """Test configuration management"""
 
@@ -49,18 +49,20 @@ def test_sql_validation():
     failed = 0
     failures = []
     
-    for i, sql in enumerate(EXAMPLE_SQL_QUERIES, 1):
-        is_valid, error = SQLValidator.validate(sql)
-        
+    # Validate the whole corpus up front (validate() is memoized across reruns)
+    results = list(map(SQLValidator.validate, EXAMPLE_SQL_QUERIES))
+
+    # Buffer the per-query report and emit it in one write
+    out = []
+    for i, (sql, (is_valid, error)) in enumerate(zip(EXAMPLE_SQL_QUERIES, results), 1):
         if is_valid:
-            print(f"✅ [{i:2d}] PASS: {sql[:60]}...")
+            out.append(f"✅ [{i:2d}] PASS: {sql[:60]}...\n\n")
             passed += 1
         else:
-            print(f"❌ [{i:2d}] FAIL: {sql[:60]}...")
-            print(f"    Error: {error}")
+            out.append(f"❌ [{i:2d}] FAIL: {sql[:60]}...\n    Error: {error}\n\n")
             failed += 1
             failures.append((sql, error))
-        print()
+    sys.stdout.write("".join(out))
     
     print("=" * 80)
     print("SUMMARY")